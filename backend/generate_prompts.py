@@ -0,0 +1,35 @@
+# ResumeCoach/backend/generate_prompts.py
+"""
+Build step: inlines prompts/*.txt into a prompts_generated.py module so the
+Lambda reads no prompt files at cold start.
+
+Usage (run by the CDK bundling command):
+    python generate_prompts.py /asset-output
+"""
+import pathlib
+import sys
+
+PROMPTS_DIR = pathlib.Path(__file__).parent / 'prompts'
+GENERATED_MODULE = 'prompts_generated.py'
+
+def generate_prompts_module(output_dir: pathlib.Path) -> pathlib.Path:
+    """Writes PROMPT_TEMPLATES = {filename: text} for every prompt file into output_dir."""
+    templates = {
+        path.name: path.read_text(encoding='utf-8')
+        for path in sorted(PROMPTS_DIR.glob('*.txt'))
+    }
+    lines = [
+        "# Generated by generate_prompts.py from prompts/*.txt during bundling. Do not edit.",
+        "PROMPT_TEMPLATES = {",
+        *(f"    {name!r}: {text!r}," for name, text in templates.items()),
+        "}",
+        "",
+    ]
+    output_path = output_dir / GENERATED_MODULE
+    output_path.write_text("\n".join(lines), encoding='utf-8')
+    return output_path
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python generate_prompts.py <output_dir>")
+    print(f"Wrote {generate_prompts_module(pathlib.Path(sys.argv[1]))}")
@@ -1,22 +1,22 @@
 # ResumeCoach/backend/handler.py
-import json
+import orjson
+import zstandard
 import boto3
 import os
 import uuid
-from datetime import datetime, timedelta
 import logging
-import pickle
 import base64
-import pathlib
+import hashlib
+import time
+import gzip
+import re
+from concurrent.futures import ThreadPoolExecutor
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import (
-    ChatPromptTemplate, SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate, MessagesPlaceholder
-)
-from langchain.schema import HumanMessage, AIMessage
-from langchain.schema.output_parser import StrOutputParser
-from langchain.schema.runnable import RunnablePassthrough
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectTimeoutError, ReadTimeoutError
+# LangChain/OpenAI imports are deferred to the LLM routes (see get_llm) so that
+# cold starts serving only /items don't pay their import cost.
 
 # --- Configuration ---
 logger = logging.getLogger()
@@ -29,74 +29,163 @@ if not ITEMS_TABLE_NAME or not SESSIONS_TABLE_NAME:
     logger.error("FATAL: Environment variable ITEMS_TABLE_NAME or SESSIONS_TABLE_NAME is not set.")
     raise ValueError("FATAL: ITEMS_TABLE_NAME or SESSIONS_TABLE_NAME not set.")
 
-ssm = boto3.client('ssm')
-param_name = os.environ.get('OPENAI_API_PARAM_NAME')
+# --- AWS Client Config ---
+# TCP keep-alive plus a small pool lets warm invocations reuse the same TLS socket to AWS
+# instead of paying a fresh handshake per call. Shared by every client created at cold start.
+# Short timeouts (botocore defaults to 60s) let a stuck request be retried quickly instead
+# of pinning the Lambda until API Gateway's 29s limit; standard mode retries timeouts.
+aws_client_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=10,
+    connect_timeout=0.5,
+    read_timeout=1,
+    retries={'max_attempts': 3, 'mode': 'standard'}
+)
+AWS_TIMEOUT_ERRORS = (ConnectTimeoutError, ReadTimeoutError)
+SLOW_DYNAMODB_CALL_SECONDS = 0.1 # Slower calls log their request ID for AWS support
 
-OPENAI_API_KEY = None
-if param_name:
-    try:
-        OPENAI_API_KEY = ssm.get_parameter(
-            Name=param_name,
-            WithDecryption=True
-        )['Parameter']['Value']
-        logger.info("Fetched OpenAI API key from SSM Parameter Store.")
-    except Exception as e:
-        logger.error(f"Could not retrieve OpenAI key from SSM ({param_name}): {e}")
-# fallback for local/dev where you might still export OPENAI_API_KEY
-OPENAI_API_KEY = OPENAI_API_KEY or os.environ.get('OPENAI_API_KEY')
+# --- OpenAI API Key ---
+# Fetched from SSM on the first LLM call, not at import, so cold starts that only serve
+# /items skip the decrypting round-trip. The key is then memoized for the container's lifetime.
+OPENAI_API_PARAM_NAME = os.environ.get('OPENAI_API_PARAM_NAME')
+openai_api_key = None
 
-if not OPENAI_API_KEY:
-    logger.error("WARN: Environment variable OPENAI_API_KEY is not set. LLM calls will fail.")
+def get_openai_api_key() -> str | None:
+    """Returns the OpenAI API key from SSM Parameter Store (or the OPENAI_API_KEY env var), memoized."""
+    global openai_api_key
+    if openai_api_key is None:
+        if OPENAI_API_PARAM_NAME:
+            try:
+                ssm = boto3.client('ssm', config=aws_client_config)
+                openai_api_key = ssm.get_parameter(
+                    Name=OPENAI_API_PARAM_NAME,
+                    WithDecryption=True
+                )['Parameter']['Value']
+                logger.info("Fetched OpenAI API key from SSM Parameter Store.")
+            except Exception as e:
+                logger.error("Could not retrieve OpenAI key from SSM (%s): %s", OPENAI_API_PARAM_NAME, e)
+        # fallback for local/dev where you might still export OPENAI_API_KEY
+        openai_api_key = openai_api_key or os.environ.get('OPENAI_API_KEY')
+        if not openai_api_key:
+            logger.error("WARN: OpenAI API key is not available from SSM or OPENAI_API_KEY. LLM calls will fail.")
+    return openai_api_key
 
 # --- LLM Setup ---
 llm = None
-if OPENAI_API_KEY:
-    try:
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            openai_api_key=OPENAI_API_KEY,
-            temperature=0.3,
-            max_tokens=1500
-        )
-        logger.info("ChatOpenAI model initialized successfully.")
-    except Exception as e:
-        logger.error(f"Failed to initialize ChatOpenAI model: {e}", exc_info=True)
-else:
-    logger.warning("LLM not initialized because OPENAI_API_KEY is missing.")
+OPENAI_KEEPALIVE_SECONDS = 300
+
+def get_llm():
+    """Lazily imports LangChain and initializes the ChatOpenAI model on first use."""
+    global llm
+    if llm is None and get_openai_api_key():
+        try:
+            import httpx
+            from langchain_openai import ChatOpenAI
+            # httpx drops idle connections after 5s by default, so warm invocations a few seconds
+            # apart would renegotiate TLS with api.openai.com; keep the socket for 5 minutes instead.
+            openai_http_client = httpx.Client(
+                limits=httpx.Limits(max_keepalive_connections=5, keepalive_expiry=OPENAI_KEEPALIVE_SECONDS)
+            )
+            llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                openai_api_key=openai_api_key,
+                temperature=0.3,
+                max_tokens=1500,
+                http_client=openai_http_client
+            )
+            logger.info("ChatOpenAI model initialized successfully.")
+        except Exception as e:
+            logger.error("Failed to initialize ChatOpenAI model: %s", e, exc_info=True)
+    return llm
 
 # --- AWS Clients ---
-dynamodb_resource = boto3.resource('dynamodb')
+# Created once at cold start and reused across warm invocations.
+dynamodb_resource = boto3.resource('dynamodb', config=aws_client_config)
+# Shares the resource's connection pool and, like the resource, takes plain Python values; used for transactions
+dynamodb_client = dynamodb_resource.meta.client
 items_table = dynamodb_resource.Table(ITEMS_TABLE_NAME)
 sessions_table = dynamodb_resource.Table(SESSIONS_TABLE_NAME)
 
+# Prime credentials, DNS, TLS and the SigV4 signer during the INIT phase so the first
+# user request doesn't pay the connection setup cost. Must never fail the import.
+try:
+    items_table.get_item(Key={'id': '__warmup__'})
+    logger.info("DynamoDB connection warmed up.")
+except Exception as e:
+    logger.warning("DynamoDB warm-up call failed (continuing): %s", e)
+
 # --- CORS Headers ---
 CORS_HEADERS = {
     'Content-Type': 'application/json',
     'Access-Control-Allow-Origin': '*', # Adjust in production!
     'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Session-Id',
     'Access-Control-Allow-Methods': 'OPTIONS,POST,GET',
-    'Access-Control-Expose-Headers': 'X-Session-Id'
+    'Access-Control-Expose-Headers': 'X-Session-Id,ETag'
 }
+# API Gateway answers CORS preflights itself (corsPreflight in the CDK stack); this constant
+# response only covers preflights that still reach the function, without any routing work.
+PREFLIGHT_RESPONSE = {'statusCode': 204, 'headers': CORS_HEADERS, 'body': ''}
 
 # --- Prompt Loading ---
-backend_dir = pathlib.Path(__file__).parent
-prompts_dir = backend_dir / 'prompts'
+prompts_dir = os.path.join(os.path.dirname(__file__), 'prompts')
+
+# Deployed bundles inline the prompt files into prompts_generated.py (see generate_prompts.py),
+# so cold starts do no file I/O; local dev falls back to reading prompts/*.txt.
+try:
+    from prompts_generated import PROMPT_TEMPLATES
+except ImportError:
+    PROMPT_TEMPLATES = {}
 
 def load_prompt_template(filename: str) -> str:
-    """Loads a prompt template string from the prompts directory."""
+    """Returns a prompt template, from the generated module if bundled, else from the prompts directory."""
+    if filename in PROMPT_TEMPLATES:
+        return PROMPT_TEMPLATES[filename]
     try:
-        prompt_path = prompts_dir / filename
+        prompt_path = os.path.join(prompts_dir, filename)
         with open(prompt_path, 'r', encoding='utf-8') as f:
             return f.read()
     except FileNotFoundError:
-        logger.error(f"Prompt file not found: {prompt_path}")
+        logger.error("Prompt file not found: %s", prompt_path)
         return "Error: Prompt template missing."
     except Exception as e:
-        logger.error(f"Error loading prompt {filename}: {e}", exc_info=True)
+        logger.error("Error loading prompt %s: %s", filename, e, exc_info=True)
         return "Error: Could not load prompt template."
 
 ANALYSIS_SYSTEM_PROMPT_TEMPLATE = load_prompt_template("analysis_system_prompt.txt")
 CHAT_SYSTEM_PROMPT_TEMPLATE = load_prompt_template("chat_system_prompt.txt")
+CHAT_SUMMARY_PROMPT_TEMPLATE = load_prompt_template("chat_summary_prompt.txt")
+
+# Templates are split once at cold start into alternating [literal, name, literal, ...] parts,
+# so each request renders its system prompt with a single join instead of re-parsing the template.
+PROMPT_PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+def split_prompt_template(template: str) -> list:
+    """Splits a '{name}'-style template into alternating literal chunks and placeholder names."""
+    return PROMPT_PLACEHOLDER_PATTERN.split(template)
+
+def render_prompt(parts: list, **values) -> str:
+    """Renders pre-split template parts (see split_prompt_template) with the given values."""
+    return ''.join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
+ANALYSIS_SYSTEM_PROMPT_PARTS = split_prompt_template(ANALYSIS_SYSTEM_PROMPT_TEMPLATE)
+CHAT_SYSTEM_PROMPT_PARTS = split_prompt_template(CHAT_SYSTEM_PROMPT_TEMPLATE)
+CHAT_SUMMARY_PROMPT_PARTS = split_prompt_template(CHAT_SUMMARY_PROMPT_TEMPLATE)
+
+# --- LLM Chain ---
+# Prompts are rendered into message lists by the callers, so every route shares one
+# LLM | StrOutputParser chain, composed once per warm container.
+text_chain = None
+
+def get_text_chain():
+    """Returns the cached LLM-to-string chain, building it on first use. None if the LLM is unavailable."""
+    global text_chain
+    if text_chain is None:
+        llm = get_llm()
+        if llm:
+            from langchain.schema.output_parser import StrOutputParser
+
+            text_chain = llm | StrOutputParser()
+    return text_chain
 
 
 # --- Helper Functions ---
@@ -111,110 +200,471 @@ def create_api_gateway_response(status_code: int, body: dict, session_id: str |
     return {
         'statusCode': status_code,
         'headers': response_headers,
-        'body': json.dumps(body)
+        'body': orjson.dumps(body).decode('utf-8') # API Gateway expects a str body
     }
 
+def fingerprint(*parts: str) -> str:
+    """Returns a 32-char blake2b hex digest of the given strings, NUL-separated (cache keys, ETags)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for i, part in enumerate(parts):
+        if i:
+            digest.update(b'\x00')
+        digest.update(part.encode('utf-8'))
+    return digest.hexdigest()
+
+# Resume + JD bodies are tens of KB; anything far larger is rejected before it is parsed.
+MAX_REQUEST_BODY_BYTES = 200_000
+
+def request_body_too_large(body: str) -> bool:
+    """Checks the body's UTF-8 size against MAX_REQUEST_BODY_BYTES; a str length undercounts non-ASCII text."""
+    # Each character is 1-4 bytes, so only bodies between the two bounds need encoding
+    if len(body) > MAX_REQUEST_BODY_BYTES:
+        return True
+    if len(body) * 4 <= MAX_REQUEST_BODY_BYTES:
+        return False
+    return len(body.encode('utf-8')) > MAX_REQUEST_BODY_BYTES
+
+def has_required_strings(body, *field_names: str) -> bool:
+    """Checks that a parsed JSON body is an object whose given fields are all non-empty strings."""
+    return isinstance(body, dict) and all(isinstance(body.get(name), str) and body[name] for name in field_names)
+
+GZIP_MIN_BODY_BYTES = 1024 # Below this, gzip + base64 overhead outweighs the savings
+
+def compress_response_if_accepted(response: dict, event: dict) -> dict:
+    """
+    Gzip-compresses large response bodies when the client sends Accept-Encoding: gzip.
+    The body is base64-encoded as API Gateway requires for binary payloads, and kept
+    uncompressed whenever that wouldn't make it smaller.
+    """
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded'):
+        return response
+    accept_encoding = (event.get('headers') or {}).get('accept-encoding', '') # HTTP API lowercases header names
+    if 'gzip' not in accept_encoding.lower():
+        return response
+    body_bytes = body.encode('utf-8')
+    if len(body_bytes) < GZIP_MIN_BODY_BYTES:
+        return response
+    compressed_body = base64.b64encode(gzip.compress(body_bytes, compresslevel=6)).decode('ascii')
+    if len(compressed_body) >= len(body_bytes):
+        return response
+    response['headers']['Content-Encoding'] = 'gzip'
+    response['headers']['Vary'] = 'Accept-Encoding'
+    response['body'] = compressed_body
+    response['isBase64Encoded'] = True
+    return response
+
 # --- Session Management ---
-SESSION_TTL_HOURS = 24
+SESSION_TTL_SECONDS = 24 * 3600
+
+# Chat history is stored as a native DynamoDB list of {'r': role, 'c': content} maps.
+CHAT_ROLE_HUMAN = 'h'
+CHAT_ROLE_AI = 'a'
+
+# The large, write-once context fields are stored as one zstd-compressed Binary attribute
+# ('context'), shrinking the item (and its WCU cost) several-fold. chat_history stays a native
+# list so individual turns remain readable and appendable.
+SESSION_CONTEXT_FIELDS = {'resume': 'r', 'jobDescription': 'j', 'initialAnalysis': 'a'}
+session_compressor = zstandard.ZstdCompressor(level=3)
+session_decompressor = zstandard.ZstdDecompressor()
+
+def compress_session_context(session_data: dict) -> bytes:
+    """Packs the session's context fields into one zstd-compressed JSON payload."""
+    return session_compressor.compress(orjson.dumps({
+        short_key: session_data[field]
+        for field, short_key in SESSION_CONTEXT_FIELDS.items() if field in session_data
+    }))
+
+def decompress_session_context(blob: bytes) -> dict:
+    """Unpacks a 'context' payload back into the session's full field names."""
+    payload = orjson.loads(session_decompressor.decompress(blob))
+    return {field: payload[short_key] for field, short_key in SESSION_CONTEXT_FIELDS.items() if short_key in payload}
+
+def is_chat_message_list(value) -> bool:
+    """Checks in a single pass that value is a list of LangChain Human/AI messages."""
+    from langchain.schema import HumanMessage, AIMessage
+    message_types = (HumanMessage, AIMessage) # Bound once, not rebuilt per message
+    return isinstance(value, list) and all(isinstance(m, message_types) for m in value)
+
+def serialize_chat_history(messages: list) -> list:
+    """Converts LangChain Human/AI messages into compact role/content maps for DynamoDB."""
+    return [
+        {'r': CHAT_ROLE_HUMAN if m.type == 'human' else CHAT_ROLE_AI, 'c': m.content}
+        for m in messages
+    ]
+
+def deserialize_chat_history(stored: list) -> list:
+    """Rebuilds LangChain messages from stored role/content maps."""
+    from langchain.schema import HumanMessage, AIMessage
+    return [
+        HumanMessage(content=m['c']) if m['r'] == CHAT_ROLE_HUMAN else AIMessage(content=m['c'])
+        for m in stored
+    ]
+
+def log_if_slow(operation: str, started_at: float, response: dict):
+    """Logs the DynamoDB request ID when a call took longer than SLOW_DYNAMODB_CALL_SECONDS."""
+    elapsed = time.monotonic() - started_at
+    if elapsed > SLOW_DYNAMODB_CALL_SECONDS:
+        request_id = response.get('ResponseMetadata', {}).get('RequestId')
+        logger.warning("Slow DynamoDB %s: %.0f ms (RequestId %s)", operation, elapsed * 1000, request_id)
 
 def get_session_data(session_id: str) -> dict | None:
-    """Loads session data from DynamoDB, deserializing chat history."""
+    """
+    Loads session data from DynamoDB, deserializing chat history.
+    Timeouts that outlast the client retries are raised (AWS_TIMEOUT_ERRORS) rather than reported as a missing session.
+    """
     if not session_id:
         return None
     try:
+        started_at = time.monotonic()
         response = sessions_table.get_item(Key={'sessionId': session_id})
+        log_if_slow('GetItem', started_at, response)
         item = response.get('Item')
         if item:
-            if 'chat_history_blob' in item:
-                try:
-                    pickled_history = base64.b64decode(item['chat_history_blob'])
-                    deserialized_history = pickle.loads(pickled_history)
-                    # Verify structure after unpickling
-                    if isinstance(deserialized_history, list) and all(isinstance(m, (HumanMessage, AIMessage)) for m in deserialized_history):
-                        item['chat_history'] = deserialized_history
-                    else:
-                        logger.warning(f"Deserialized history for {session_id} is not a list of LangChain messages. Resetting.")
-                        item['chat_history'] = []
-                except (pickle.UnpicklingError, TypeError, base64.binascii.Error, AttributeError, EOFError) as e:
-                    logger.error(f"Error deserializing chat history for session {session_id}: {e}", exc_info=True)
-                    item['chat_history'] = [] # Recover by resetting history
-                del item['chat_history_blob'] # Remove blob regardless of success
-            else:
-                item['chat_history'] = [] # Initialize if blob doesn't exist
+            if 'context' in item:
+                item.update(decompress_session_context(item.pop('context').value))
+            # Sessions written before the list format carry a pickled blob; start their history afresh
+            item.pop('chat_history_blob', None)
+            try:
+                item['chat_history'] = deserialize_chat_history(item.get('chat_history', []))
+            except (KeyError, TypeError) as e:
+                logger.error("Malformed chat history for session %s, resetting: %s", session_id, e)
+                item['chat_history'] = [] # Recover by resetting history
 
-            logger.info(f"Loaded session {session_id}")
+            logger.info("Loaded session %s", session_id)
             return item
         else:
-            logger.info(f"Session {session_id} not found.")
+            logger.info("Session %s not found.", session_id)
             return None
+    except AWS_TIMEOUT_ERRORS:
+        raise
     except Exception as e:
-        logger.error(f"Error loading session {session_id}: {e}", exc_info=True)
+        logger.error("Error loading session %s: %s", session_id, e, exc_info=True)
         return None
 
+def build_session_item(session_data: dict) -> dict:
+    """Builds the DynamoDB item for a new session (compressed context, serialized chat history, TTL)."""
+    session_id = session_data['sessionId']
+    chat_history_list = session_data.get('chat_history', [])
+    if not is_chat_message_list(chat_history_list):
+        logger.warning("Chat history for session %s is not in expected format for serialization. Saving empty history.", session_id)
+        chat_history_list = []
+
+    now_ms = time.time_ns() // 1_000_000
+    # Built field by field so transient in-memory keys never leak into the table
+    item = {
+        'sessionId': session_id,
+        'context': compress_session_context(session_data),
+        'chat_history': serialize_chat_history(chat_history_list),
+        'createdAt': session_data.get('createdAt', now_ms),
+        'ttl': now_ms // 1000 + SESSION_TTL_SECONDS, # DynamoDB TTL is epoch seconds
+        'lastUpdated': now_ms # Epoch milliseconds
+    }
+    if 'chatSummary' in session_data:
+        item['chatSummary'] = session_data['chatSummary']
+        item['chatSummaryCount'] = session_data['chatSummaryCount']
+    return item
+
+# A retried or colliding create can't clobber an existing session's history
+NEW_SESSION_CONDITION = 'attribute_not_exists(sessionId)'
+
 def save_session_data(session_data: dict):
-    """Saves session data to DynamoDB, serializing chat history and setting TTL."""
+    """
+    Writes a new session to DynamoDB.
+    Never overwrites an existing session; later chat turns go through append_session_chat_turn.
+    """
     if not session_data or 'sessionId' not in session_data:
         logger.error("Attempted to save invalid session data (missing sessionId).")
         return
 
     session_id = session_data['sessionId']
     try:
-        ttl_timestamp = int((datetime.utcnow() + timedelta(hours=SESSION_TTL_HOURS)).timestamp())
-        item_to_save = session_data.copy()
-        item_to_save['ttl'] = ttl_timestamp
-        item_to_save['lastUpdated'] = datetime.utcnow().isoformat()
-
-        if 'chat_history' in item_to_save:
-            chat_history_list = item_to_save['chat_history']
-            # Serialize only if it's a valid list of LangChain messages
-            if isinstance(chat_history_list, list) and all(isinstance(m, (HumanMessage, AIMessage)) for m in chat_history_list):
-                try:
-                    pickled_history = pickle.dumps(chat_history_list)
-                    item_to_save['chat_history_blob'] = base64.b64encode(pickled_history).decode('utf-8')
-                except pickle.PicklingError as e:
-                    logger.error(f"Error serializing chat history for session {session_id}: {e}", exc_info=True)
-                    # Avoid saving potentially corrupted state by removing the blob if pickling fails
-                    if 'chat_history_blob' in item_to_save: del item_to_save['chat_history_blob']
-            else:
-                 logger.warning(f"Chat history for session {session_id} is not in expected format for serialization. Skipping history save.")
-                 if 'chat_history_blob' in item_to_save: del item_to_save['chat_history_blob'] # Ensure no partial state
+        session_item = build_session_item(session_data) # Compressed before timing so only DynamoDB is measured
+        started_at = time.monotonic()
+        response = sessions_table.put_item(Item=session_item, ConditionExpression=NEW_SESSION_CONDITION)
+        log_if_slow('PutItem', started_at, response)
+        logger.info("Saved session %s", session_id)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            logger.warning("Session %s already exists; not overwriting it.", session_id)
+        else:
+            logger.error("Error saving session %s: %s", session_id, e, exc_info=True)
+    except Exception as e:
+        logger.error("Error saving session %s: %s", session_id, e, exc_info=True)
 
-            del item_to_save['chat_history'] # Always remove the raw list before saving
+def append_session_chat_turn(session_data: dict, new_messages: list):
+    """
+    Persists a chat turn with UpdateItem, appending only the new messages to the stored history
+    (list_append) and refreshing the rolling summary and timestamps; the compressed context
+    written by save_session_data is left untouched.
+    """
+    session_id = session_data['sessionId']
+    if not is_chat_message_list(new_messages):
+        logger.warning("Chat messages for session %s are not in expected format for serialization. Skipping history save.", session_id)
+        return
+    try:
+        now_ms = time.time_ns() // 1_000_000
+        update_expression = 'SET chat_history = list_append(if_not_exists(chat_history, :empty), :new), #ttl = :t, lastUpdated = :u'
+        expression_values = {
+            ':empty': [],
+            ':new': serialize_chat_history(new_messages),
+            ':t': now_ms // 1000 + SESSION_TTL_SECONDS, # DynamoDB TTL is epoch seconds
+            ':u': now_ms # Epoch milliseconds
+        }
+        if 'chatSummary' in session_data:
+            update_expression += ', chatSummary = :s, chatSummaryCount = :c'
+            expression_values[':s'] = session_data['chatSummary']
+            expression_values[':c'] = session_data['chatSummaryCount']
 
-        sessions_table.put_item(Item=item_to_save)
-        logger.info(f"Saved session {session_id}")
+        started_at = time.monotonic()
+        response = sessions_table.update_item(
+            Key={'sessionId': session_id},
+            UpdateExpression=update_expression,
+            # Never recreate a session as a context-less stub if it expired mid-conversation
+            ConditionExpression='attribute_exists(sessionId)',
+            ExpressionAttributeNames={'#ttl': 'ttl'}, # 'ttl' is a reserved keyword
+            ExpressionAttributeValues=expression_values
+        )
+        log_if_slow('UpdateItem', started_at, response)
+        logger.info("Appended chat turn to session %s", session_id)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            logger.warning("Session %s disappeared before its chat turn was saved.", session_id)
+        else:
+            logger.error("Error updating session %s: %s", session_id, e, exc_info=True)
     except Exception as e:
-        logger.error(f"Error saving session {session_id}: {e}", exc_info=True)
+        logger.error("Error updating session %s: %s", session_id, e, exc_info=True)
+
+# --- Chat History Window ---
+# Once more than CHAT_SUMMARY_TRIGGER_MESSAGES unsummarized messages accumulate, everything but
+# the last CHAT_RECENT_MESSAGES is folded into a rolling summary stored on the session
+# ('chatSummary', covering the first 'chatSummaryCount' messages). The full history is still saved.
+CHAT_SUMMARY_TRIGGER_MESSAGES = 16
+CHAT_RECENT_MESSAGES = 8
+
+def get_prompt_chat_history(session_data: dict) -> list:
+    """
+    Returns the history to send to the LLM: a summary of older turns plus recent turns verbatim.
+    Updates 'chatSummary'/'chatSummaryCount' on session_data when a new summary is produced.
+    """
+    from langchain.schema import SystemMessage, HumanMessage
+
+    chat_history = session_data.get('chat_history', [])
+    summary = session_data.get('chatSummary', '')
+    summarized_count = int(session_data.get('chatSummaryCount', 0)) # DynamoDB returns Decimal
+
+    if len(chat_history) - summarized_count > CHAT_SUMMARY_TRIGGER_MESSAGES and "Error:" not in CHAT_SUMMARY_PROMPT_TEMPLATE:
+        cutoff = len(chat_history) - CHAT_RECENT_MESSAGES
+        try:
+            logger.info("Summarizing chat messages %s-%s for session %s.", summarized_count, cutoff, session_data.get('sessionId'))
+            summary = get_text_chain().invoke([
+                SystemMessage(content=render_prompt(CHAT_SUMMARY_PROMPT_PARTS, previous_summary=summary or "(none yet)")),
+                *chat_history[summarized_count:cutoff],
+                HumanMessage(content="Write the updated summary.")
+            ])
+            summarized_count = cutoff
+            session_data['chatSummary'] = summary
+            session_data['chatSummaryCount'] = summarized_count
+        except Exception as e:
+            # Fall back to sending the unsummarized tail; the next turn will try again
+            logger.warning("Chat history summarization failed for session %s: %s", session_data.get('sessionId'), e)
+
+    # Hard sliding-window cap, so prompt size stays bounded even if summarization keeps failing
+    # (or its template is missing); both limits are even so turns are never split mid-pair.
+    recent_history = chat_history[max(summarized_count, len(chat_history) - CHAT_SUMMARY_TRIGGER_MESSAGES):]
+    if summary:
+        return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] + recent_history
+    return recent_history
+
+# --- DynamoDB Batch Helpers ---
+BATCH_GET_MAX_KEYS = 100 # DynamoDB BatchGetItem limit per request
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_BASE_DELAY_SECONDS = 0.05
+
+def chunks(sequence: list, size: int):
+    """Yields consecutive slices of at most `size` elements."""
+    for start in range(0, len(sequence), size):
+        yield sequence[start:start + size]
+
+def batch_get_many(table_name: str, keys: list, **table_kwargs) -> tuple[list, list]:
+    """
+    Fetches many items with BatchGetItem, BATCH_GET_MAX_KEYS keys per request, re-issuing
+    UnprocessedKeys with exponential backoff. Extra kwargs (e.g. ProjectionExpression) apply to every request.
+    Returns (items, unprocessed_keys); unprocessed_keys is non-empty only if retries ran out.
+    """
+    items = []
+    unprocessed_keys = []
+    for key_chunk in chunks(keys, BATCH_GET_MAX_KEYS):
+        request_items = {table_name: {**table_kwargs, 'Keys': key_chunk}}
+        attempt = 0
+        while request_items:
+            if attempt > BATCH_GET_MAX_RETRIES:
+                unprocessed_keys.extend(request_items[table_name]['Keys'])
+                break
+            if attempt:
+                logger.info("Batch get returned unprocessed keys, retrying (attempt %s)...", attempt)
+                time.sleep(BATCH_GET_BASE_DELAY_SECONDS * (2 ** (attempt - 1))) # Exponential backoff
+            response = dynamodb_resource.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            request_items = response.get('UnprocessedKeys') or {}
+            attempt += 1
+    return items, unprocessed_keys
 
 # --- Default Items Endpoints ---
-def get_all_default_item_metadata(event):
-    """Retrieves metadata (id, name) for all default items from the items table."""
-    logger.info("Attempting to fetch all default items metadata via Scan.")
-    try:
-        # Project only 'id' and 'name' attributes. '#nm' aliases 'name' (reserved keyword).
-        response = items_table.scan(
-            ProjectionExpression='id, #nm',
-            ExpressionAttributeNames={'#nm': 'name'}
+DEFAULT_ITEMS_INDEX_NAME = 'byType' # GSI on the items table, partition key 'type'
+DEFAULT_ITEM_TYPE = 'default'
+
+DEFAULT_ITEMS_SCAN_SEGMENTS = 4 # Parallel Scan fallback; stays below max_pool_connections
+DEFAULT_ITEMS_KEY_CONDITION = Key('type').eq(DEFAULT_ITEM_TYPE)
+DEFAULT_ITEM_METADATA_PROJECTION = 'id, #nm' # Only 'id' and 'name'; '#nm' aliases 'name' (reserved keyword)
+
+def default_item_metadata_kwargs(**kwargs) -> dict:
+    """
+    Builds the request kwargs shared by every metadata Query/Scan page.
+    The names dict is created per request because boto3 merges generated placeholders into it in place.
+    """
+    return {
+        'ProjectionExpression': DEFAULT_ITEM_METADATA_PROJECTION,
+        'ExpressionAttributeNames': {'#nm': 'name'},
+        **kwargs
+    }
+
+def query_default_item_metadata() -> list:
+    """Queries the type index for default item metadata (id, name), following pagination."""
+    # Default items share the constant partition type='default' on the type index, so this
+    # reads only those items instead of scanning the whole table.
+    query_kwargs = default_item_metadata_kwargs(
+        IndexName=DEFAULT_ITEMS_INDEX_NAME,
+        KeyConditionExpression=DEFAULT_ITEMS_KEY_CONDITION
+    )
+    response = items_table.query(**query_kwargs)
+    items = response.get('Items', [])
+    # Handle pagination
+    while 'LastEvaluatedKey' in response:
+        logger.info("Default items query paginated, fetching next page...")
+        response = items_table.query(**query_kwargs, ExclusiveStartKey=response['LastEvaluatedKey'])
+        items.extend(response.get('Items', []))
+    return items
+
+def scan_default_item_metadata() -> list:
+    """
+    Scans the whole items table for named item metadata (id, name) using parallel segments.
+    Only used while the type index is unavailable (e.g. still backfilling after deploy) or
+    returns nothing because existing default rows predate the 'type' attribute.
+    """
+    def scan_segment(segment: int) -> list:
+        scan_kwargs = default_item_metadata_kwargs(
+            FilterExpression=Attr('name').exists(), # Skips ANALYSIS# cache rows, which have no name
+            Segment=segment,
+            TotalSegments=DEFAULT_ITEMS_SCAN_SEGMENTS
         )
-        items = response.get('Items', [])
-        # Handle pagination
+        response = items_table.scan(**scan_kwargs)
+        segment_items = response.get('Items', [])
         while 'LastEvaluatedKey' in response:
-            logger.info("Default items scan paginated, fetching next page...")
-            response = items_table.scan(
-                ProjectionExpression='id, #nm',
-                ExpressionAttributeNames={'#nm': 'name'},
-                ExclusiveStartKey=response['LastEvaluatedKey']
+            response = items_table.scan(**scan_kwargs, ExclusiveStartKey=response['LastEvaluatedKey'])
+            segment_items.extend(response.get('Items', []))
+        return segment_items
+
+    with ThreadPoolExecutor(max_workers=DEFAULT_ITEMS_SCAN_SEGMENTS) as executor:
+        segments = executor.map(scan_segment, range(DEFAULT_ITEMS_SCAN_SEGMENTS))
+        return [item for segment_items in segments for item in segment_items]
+
+# Default items rarely change, so warm containers serve them from memory for a few minutes.
+DEFAULT_ITEM_CACHE_TTL_SECONDS = 300
+DEFAULT_ITEM_CACHE_MAX_ENTRIES = 256 # Far above the number of default items; bounds memory if clients probe random IDs
+default_item_cache = {} # item_id -> (fetched_at monotonic seconds, item), oldest first
+default_item_list_cache = None # (fetched_at monotonic seconds, encoded GET /items response)
+
+def get_cached_default_item(item_id: str) -> dict | None:
+    """Returns a default item from the in-process cache if present and fresh."""
+    entry = default_item_cache.get(item_id)
+    if entry and time.monotonic() - entry[0] < DEFAULT_ITEM_CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+def is_default_item(item: dict | None) -> bool:
+    """
+    The items table also holds other users' ANALYSIS# cache rows, which must never be served as examples.
+    Checked by key rather than by 'type' so default rows written before that attribute still qualify.
+    """
+    return bool(item) and not item['id'].startswith(ANALYSIS_CACHE_KEY_PREFIX) and 'analysis' not in item
+
+def cache_default_item(item: dict):
+    """Stores a fetched default item in the in-process cache, first dropping expired or excess entries."""
+    now = time.monotonic()
+    default_item_cache.pop(item['id'], None) # Re-inserted below so dict order stays oldest first
+    while default_item_cache:
+        oldest_id = next(iter(default_item_cache))
+        if len(default_item_cache) < DEFAULT_ITEM_CACHE_MAX_ENTRIES and now - default_item_cache[oldest_id][0] < DEFAULT_ITEM_CACHE_TTL_SECONDS:
+            break
+        del default_item_cache[oldest_id]
+    default_item_cache[item['id']] = (now, item)
+
+def get_cached_default_item_list_response() -> dict | None:
+    """Returns a copy of the cached GET /items response if present and fresh."""
+    if default_item_list_cache and time.monotonic() - default_item_list_cache[0] < DEFAULT_ITEM_CACHE_TTL_SECONDS:
+        cached_response = default_item_list_cache[1]
+        # Headers are copied because compress_response_if_accepted edits them in place
+        return dict(cached_response, headers=dict(cached_response['headers']))
+    return None
+
+def cache_default_item_list_response(response: dict):
+    """Stores the already JSON-encoded GET /items response in the in-process cache."""
+    global default_item_list_cache
+    default_item_list_cache = (time.monotonic(), dict(response, headers=dict(response['headers'])))
+
+def get_all_default_item_metadata(event):
+    """
+    Retrieves metadata (id, name) for all default items via the type index,
+    or only for the items listed in an optional ?ids=a,b,c query parameter.
+    """
+    ids_param = (event.get('queryStringParameters') or {}).get('ids')
+    try:
+        if ids_param:
+            item_ids = list(dict.fromkeys(i for i in ids_param.split(',') if i)) # De-duplicate, keep request order
+            logger.info("Attempting to batch fetch metadata for %s default items.", len(item_ids))
+            fetched_items, unprocessed_keys = batch_get_many(
+                ITEMS_TABLE_NAME,
+                [{'id': item_id} for item_id in item_ids],
+                **default_item_metadata_kwargs()
             )
-            items.extend(response.get('Items', []))
+            if unprocessed_keys:
+                logger.error("Batch metadata fetch still had unprocessed keys after retries.")
+                return create_api_gateway_response(503, {'error': 'Default items are temporarily unavailable, please retry.'})
+            items_by_id = {item['id']: item for item in fetched_items if is_default_item(item)}
+            items = [items_by_id[item_id] for item_id in item_ids if item_id in items_by_id]
+        else:
+            cached_response = get_cached_default_item_list_response()
+            if cached_response:
+                logger.info("Serving default items metadata from in-process cache.")
+                return cached_response
+            logger.info("Attempting to fetch all default items metadata via Query.")
+            try:
+                items = query_default_item_metadata()
+            except ClientError as e:
+                # A missing or still-backfilling GSI is rejected before any data is read
+                if e.response.get('Error', {}).get('Code') not in ('ValidationException', 'ResourceNotFoundException'):
+                    raise
+                logger.warning("Default items index unavailable (%s); falling back to parallel Scan.", e)
+                items = scan_default_item_metadata()
+            else:
+                if not items:
+                    # Rows written before the index existed lack type='default' and are invisible to it
+                    logger.warning("Default items index returned no items; falling back to parallel Scan.")
+                    items = scan_default_item_metadata()
 
-        logger.info(f"Successfully scanned and retrieved metadata for {len(items)} default items.")
+        logger.info("Successfully retrieved metadata for %s default items.", len(items))
         # Filter out any malformed items just in case
         valid_items = [item for item in items if 'id' in item and 'name' in item]
         if len(valid_items) != len(items):
-            logger.warning("Some scanned default items were missing 'id' or 'name'.")
-        return create_api_gateway_response(200, valid_items)
+            logger.warning("Some retrieved default items were missing 'id' or 'name'.")
+        response = create_api_gateway_response(200, valid_items)
+        if not ids_param and valid_items:
+            # Encoded once, served as-is until the TTL expires; an empty list is re-read every request
+            cache_default_item_list_response(response)
+        return response
     except Exception as e:
-        logger.error(f"Error scanning default items table: {e}", exc_info=True)
+        logger.error("Error fetching default items metadata: %s", e, exc_info=True)
         return create_api_gateway_response(500, {'error': 'Internal server error while fetching default items list'})
 
 def get_default_item_content(event):
@@ -222,58 +672,238 @@ def get_default_item_content(event):
     item_id = None
     try:
         item_id = event['pathParameters']['id']
-        logger.info(f"Attempting to fetch default item content with ID: {item_id}")
-        response = items_table.get_item(Key={'id': item_id})
-        item = response.get('Item')
+        logger.info("Attempting to fetch default item content with ID: %s", item_id)
+        item = get_cached_default_item(item_id)
         if item:
-            logger.info(f"Successfully retrieved default item content for ID: {item_id}")
+            logger.info("Serving default item %s from in-process cache.", item_id)
+        else:
+            response = items_table.get_item(Key={'id': item_id})
+            item = response.get('Item')
+            if not is_default_item(item):
+                item = None
+            else:
+                cache_default_item(item)
+        if item:
+            content = item.get('content', 'Error: Content missing')
+            # Weak validator: the same content may be served gzip-encoded or not
+            etag = f'W/"{fingerprint(item_id, content)}"'
+            if (event.get('headers') or {}).get('if-none-match') == etag:
+                logger.info("Default item %s unchanged for client, returning 304.", item_id)
+                return {'statusCode': 304, 'headers': {**CORS_HEADERS, 'ETag': etag}, 'body': ''}
+            logger.info("Successfully retrieved default item content for ID: %s", item_id)
             # Return only essential fields
-            return create_api_gateway_response(200, {'id': item.get('id'), 'content': item.get('content', 'Error: Content missing')})
+            response = create_api_gateway_response(200, {'id': item.get('id'), 'content': content})
+            response['headers']['ETag'] = etag
+            return response
         else:
-            logger.warning(f"Default item content not found in DynamoDB with ID: {item_id}")
+            logger.warning("Default item content not found in DynamoDB with ID: %s", item_id)
             return create_api_gateway_response(404, {'error': f"Default item content not found for ID: {item_id}"})
     except KeyError:
         logger.error("Missing 'id' in pathParameters for get_default_item")
         return create_api_gateway_response(400, {'error': "Missing 'id' in request path"})
     except Exception as e:
-        logger.error(f"Error getting default item {item_id}: {e}", exc_info=True)
+        logger.error("Error getting default item %s: %s", item_id, e, exc_info=True)
         return create_api_gateway_response(500, {'error': 'Internal server error while fetching default item'})
 
+# --- Default Items Batch Fetch ---
+def get_default_items_content_batch(event):
+    """
+    Retrieves the content of several default items in one BatchGetItem round-trip.
+    Expects a JSON body {"ids": [...]}; returns found items in request order plus any missing IDs.
+    """
+    try:
+        body = orjson.loads(event.get('body') or '{}')
+        item_ids = body.get('ids') if isinstance(body, dict) else None
+        if not isinstance(item_ids, list) or not item_ids or not all(isinstance(i, str) and i for i in item_ids):
+            logger.warning("Batch item request missing a non-empty 'ids' list of strings.")
+            return create_api_gateway_response(400, {'error': '"ids" must be a non-empty list of item IDs.'})
+        item_ids = list(dict.fromkeys(item_ids)) # De-duplicate, keep request order
+        if len(item_ids) > BATCH_GET_MAX_KEYS:
+            return create_api_gateway_response(400, {'error': f'At most {BATCH_GET_MAX_KEYS} IDs can be requested at once.'})
+
+        found = {}
+        for item_id in item_ids:
+            cached_item = get_cached_default_item(item_id)
+            if cached_item:
+                found[item_id] = cached_item
+        uncached_ids = [item_id for item_id in item_ids if item_id not in found]
+
+        logger.info("Attempting to batch fetch %s default items (%s served from cache).", len(uncached_ids), len(found))
+        if uncached_ids:
+            fetched_items, unprocessed_keys = batch_get_many(
+                ITEMS_TABLE_NAME,
+                [{'id': item_id} for item_id in uncached_ids],
+                ProjectionExpression='id, content'
+            )
+            if unprocessed_keys:
+                logger.error("Batch item fetch still had unprocessed keys after retries.")
+                return create_api_gateway_response(503, {'error': 'Default items are temporarily unavailable, please retry.'})
+            for item in fetched_items:
+                if is_default_item(item):
+                    found[item['id']] = item
+                    cache_default_item(item)
+
+        items = [
+            {'id': item_id, 'content': found[item_id].get('content', 'Error: Content missing')}
+            for item_id in item_ids if item_id in found
+        ]
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing:
+            logger.warning("Default items not found in batch fetch: %s", missing)
+        return create_api_gateway_response(200, {'items': items, 'missing': missing})
+    except orjson.JSONDecodeError:
+        logger.error("Error decoding JSON body for batch item request.")
+        return create_api_gateway_response(400, {'error': 'Invalid JSON format in request body'})
+    except Exception as e:
+        logger.error("Error batch fetching default items: %s", e, exc_info=True)
+        return create_api_gateway_response(500, {'error': 'Internal server error while fetching default items'})
+
+# --- Prompt Input Limits ---
+# Resume and JD are re-sent on every chat turn, so each is capped before it reaches the model.
+MAX_FIELD_TOKENS = int(os.environ.get('MAX_FIELD_TOKENS', '2000'))
+APPROX_CHARS_PER_TOKEN = 4 # Fallback ratio if the tokenizer can't be loaded
+TOKEN_ENCODING_NAME = 'o200k_base' # gpt-4o-mini's encoding; the deploy bundle ships it in TIKTOKEN_CACHE_DIR
+token_encoder = None # None = not loaded yet, False = unavailable
+
+def get_token_encoder():
+    """
+    Lazily loads the tiktoken encoding for the model; returns False if it can't be loaded.
+    Without TIKTOKEN_CACHE_DIR (the bundled file) tiktoken would download it inside a request, so that is skipped.
+    """
+    global token_encoder
+    if token_encoder is None:
+        if not os.environ.get('TIKTOKEN_CACHE_DIR'):
+            logger.warning("TIKTOKEN_CACHE_DIR not set, prompt fields will be truncated by characters.")
+            token_encoder = False
+            return token_encoder
+        try:
+            import tiktoken
+            token_encoder = tiktoken.get_encoding(TOKEN_ENCODING_NAME)
+        except Exception as e: # Missing or unreadable file, or the download it falls back to failing
+            logger.warning("Tokenizer unavailable, prompt fields will be truncated by characters: %s", e)
+            token_encoder = False
+    return token_encoder
+
+def truncate_to_token_limit(text: str, max_tokens: int = MAX_FIELD_TOKENS) -> str:
+    """Truncates text to at most max_tokens model tokens."""
+    # Cheap exit: byte-level BPE yields at most one token per UTF-8 byte. Not per character:
+    # one emoji or CJK character can encode to several tokens.
+    if len(text.encode('utf-8')) <= max_tokens:
+        return text
+    encoder = get_token_encoder()
+    if not encoder:
+        return text[:max_tokens * APPROX_CHARS_PER_TOKEN]
+    # Plain text only: pasted strings like '<|endoftext|>' must count as text, not raise as special tokens
+    tokens = encoder.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    logger.info("Truncating prompt field from %s to %s tokens.", len(tokens), max_tokens)
+    # The cut can split a multi-byte character; drop the fragment rather than decode it to U+FFFD
+    return encoder.decode_bytes(tokens[:max_tokens]).decode('utf-8', errors='ignore')
+
+# --- Analysis Cache ---
+# The analysis is a pure function of (resume, job description), so results are cached in the
+# items table under a content hash and expired by DynamoDB TTL.
+ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANALYSIS_CACHE_KEY_PREFIX = 'ANALYSIS#'
+
+def get_analysis_cache_key(resume_text: str, job_description_text: str) -> str:
+    """Builds the items-table key for a cached analysis of this resume/JD pair."""
+    # Leading/trailing whitespace (common when pasting) doesn't change the analysis, so it doesn't change the key
+    return f"{ANALYSIS_CACHE_KEY_PREFIX}{fingerprint(resume_text.strip(), job_description_text.strip())}"
+
+def get_cached_analysis(cache_key: str) -> str | None:
+    """Returns a previously cached analysis, or None on miss or error."""
+    try:
+        response = items_table.get_item(Key={'id': cache_key})
+        item = response.get('Item')
+        if item and item.get('analysis'):
+            logger.info("Analysis cache hit for %s", cache_key)
+            return item['analysis']
+        logger.info("Analysis cache miss for %s", cache_key)
+    except Exception as e:
+        logger.warning("Error reading analysis cache %s (continuing without cache): %s", cache_key, e)
+    return None
+
+def build_cached_analysis_item(cache_key: str, analysis: str) -> dict:
+    """Builds the items-table entry caching one analysis result."""
+    return {
+        'id': cache_key,
+        'analysis': analysis,
+        'ttl': int(time.time()) + ANALYSIS_CACHE_TTL_SECONDS
+    }
+
+def save_session_with_cached_analysis(session_data: dict, cache_key: str, analysis: str):
+    """
+    Writes a new session and the analysis cache entry in one TransactWriteItems round-trip.
+    Falls back to saving just the session if the transaction fails; the cache is best-effort.
+    """
+    session_id = session_data['sessionId']
+    try:
+        transact_items = [
+            {'Put': {
+                'TableName': ITEMS_TABLE_NAME,
+                'Item': build_cached_analysis_item(cache_key, analysis)
+            }},
+            {'Put': {
+                'TableName': SESSIONS_TABLE_NAME,
+                'Item': build_session_item(session_data),
+                'ConditionExpression': NEW_SESSION_CONDITION
+            }}
+        ]
+        # Items are built (and the session compressed) before timing so only DynamoDB is measured
+        started_at = time.monotonic()
+        response = dynamodb_client.transact_write_items(TransactItems=transact_items)
+        log_if_slow('TransactWriteItems', started_at, response)
+        logger.info("Saved session %s and cached analysis under %s", session_id, cache_key)
+    except Exception as e:
+        logger.warning("Transactional save failed for session %s, saving session alone: %s", session_id, e)
+        save_session_data(session_data)
+
 # --- Core Application Logic ---
 def perform_resume_analysis(event):
     """
     Analyzes resume against job description using the LLM and creates a new session.
     Returns the analysis result and the new session ID.
     """
-    if not llm:
-        logger.error("LLM not available for analysis. Check OPENAI_API_KEY.")
-        return create_api_gateway_response(503, {'error': 'LLM service is unavailable. Check API Key configuration.'})
     if "Error:" in ANALYSIS_SYSTEM_PROMPT_TEMPLATE:
          logger.error("Analysis cannot proceed because the prompt template is missing or failed to load.")
          return create_api_gateway_response(500, {'error': 'Internal configuration error: Analysis template unavailable.'})
 
     try:
-        body = json.loads(event.get('body', '{}'))
-        resume_text = body.get('resume')
-        job_description_text = body.get('job_description')
-
-        if not resume_text or not job_description_text:
+        body = orjson.loads(event.get('body') or '{}')
+        if not has_required_strings(body, 'resume', 'job_description'):
             logger.warning("Analysis request missing resume or job description.")
             return create_api_gateway_response(400, {'error': 'Both "resume" and "job_description" are required.'})
 
+        resume_text = body['resume']
+        job_description_text = body['job_description']
+
         logger.info("Starting resume analysis and creating new session.")
 
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessagePromptTemplate.from_template(ANALYSIS_SYSTEM_PROMPT_TEMPLATE)
-        ])
-        chain = (RunnablePassthrough() | prompt | llm | StrOutputParser())
+        cache_key = get_analysis_cache_key(resume_text, job_description_text)
+        # Truncated once here; the session stores the capped text so chat turns reuse it.
+        resume_text = truncate_to_token_limit(resume_text)
+        job_description_text = truncate_to_token_limit(job_description_text)
+        analysis_result = get_cached_analysis(cache_key)
+        cache_miss = analysis_result is None
+        if cache_miss:
+            # Only misses pay for the SSM fetch, LangChain/OpenAI imports and client setup
+            chain = get_text_chain()
+            if not chain:
+                logger.error("LLM not available for analysis. Check OPENAI_API_KEY.")
+                return create_api_gateway_response(503, {'error': 'LLM service is unavailable. Check API Key configuration.'})
+            from langchain.schema import SystemMessage
 
-        logger.info("Invoking LLM chain for analysis...")
-        analysis_result = chain.invoke({
-            "resume": resume_text,
-            "job_description": job_description_text,
-        })
-        logger.info("LLM analysis completed successfully.")
+            logger.info("Invoking LLM chain for analysis...")
+            analysis_result = chain.invoke([
+                SystemMessage(content=render_prompt(
+                    ANALYSIS_SYSTEM_PROMPT_PARTS,
+                    resume=resume_text,
+                    job_description=job_description_text
+                ))
+            ])
+            logger.info("LLM analysis completed successfully.")
 
         new_session_id = str(uuid.uuid4())
         session_data = {
@@ -282,17 +912,21 @@ def perform_resume_analysis(event):
             'jobDescription': job_description_text,
             'initialAnalysis': analysis_result,
             'chat_history': [], # Initial history is empty list of messages
-            'createdAt': datetime.utcnow().isoformat()
+            'createdAt': time.time_ns() // 1_000_000 # Epoch milliseconds
         }
-        save_session_data(session_data)
+        if cache_miss:
+            # One round-trip on one pooled connection for both the cache entry and the session
+            save_session_with_cached_analysis(session_data, cache_key, analysis_result)
+        else:
+            save_session_data(session_data)
 
         return create_api_gateway_response(200, {'analysis': analysis_result}, session_id=new_session_id)
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
          logger.error("Error decoding JSON body for analysis request.")
          return create_api_gateway_response(400, {'error': 'Invalid JSON format in request body'})
     except Exception as e:
-        logger.error(f"Error during resume analysis: {e}", exc_info=True)
+        logger.error("Error during resume analysis: %s", e, exc_info=True)
         return create_api_gateway_response(500, {'error': 'Internal server error during analysis'})
 
 def handle_chat_follow_up(event):
@@ -300,25 +934,30 @@ def handle_chat_follow_up(event):
     Handles follow-up chat questions using context and history from an existing session.
     Returns the LLM's answer.
     """
-    if not llm:
-        logger.error("LLM not available for chat. Check OPENAI_API_KEY.")
-        return create_api_gateway_response(503, {'error': 'LLM service is unavailable. Check API Key configuration.'})
     if "Error:" in CHAT_SYSTEM_PROMPT_TEMPLATE:
          logger.error("Chat cannot proceed because the prompt template is missing or failed to load.")
          return create_api_gateway_response(500, {'error': 'Internal configuration error: Chat template unavailable.'})
 
     try:
-        body = json.loads(event.get('body', '{}'))
-        question = body.get('question')
-        session_id = body.get('sessionId')
-
-        if not question or not session_id:
+        body = orjson.loads(event.get('body') or '{}')
+        if not has_required_strings(body, 'question', 'sessionId'):
             logger.warning("Chat request missing question or sessionId.")
             return create_api_gateway_response(400, {'error': 'Missing required fields: "question", "sessionId".'})
+        question = body['question']
+        session_id = body['sessionId']
 
-        session_data = get_session_data(session_id)
+        # Load the session while this thread does the LLM setup, which on a container's first
+        # chat includes the SSM key fetch and the LangChain/OpenAI imports.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            session_future = executor.submit(get_session_data, session_id)
+            llm = get_llm()
+            session_data = session_future.result()
+
+        if not llm:
+            logger.error("LLM not available for chat. Check OPENAI_API_KEY.")
+            return create_api_gateway_response(503, {'error': 'LLM service is unavailable. Check API Key configuration.'})
         if not session_data:
-            logger.warning(f"Session not found for ID: {session_id}")
+            logger.warning("Session not found for ID: %s", session_id)
             return create_api_gateway_response(404, {'error': f"Session not found or expired for ID: {session_id}. Please start a new analysis."})
 
         resume_text = session_data.get('resume')
@@ -327,46 +966,52 @@ def handle_chat_follow_up(event):
         chat_history = session_data.get('chat_history', []) # Deserialized by get_session_data
 
         if not all([resume_text, job_description_text, initial_analysis]):
-             logger.error(f"Session {session_id} is missing core context (resume, jd, or analysis).")
+             logger.error("Session %s is missing core context (resume, jd, or analysis).", session_id)
              return create_api_gateway_response(500, {'error': 'Session data is corrupted or incomplete. Please start a new analysis.'})
 
-        logger.info(f"Processing chat for session {session_id} with {len(chat_history)} history messages.")
+        logger.info("Processing chat for session %s with %s history messages.", session_id, len(chat_history))
+
+        from langchain.schema import SystemMessage, HumanMessage, AIMessage
 
         current_user_message = HumanMessage(content=question)
 
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessagePromptTemplate.from_template(CHAT_SYSTEM_PROMPT_TEMPLATE),
-            MessagesPlaceholder(variable_name="chat_history"),
-            HumanMessagePromptTemplate.from_template("{current_question}")
-        ])
-        chain = prompt | llm | StrOutputParser()
-
-        logger.info(f"Invoking LLM chain for chat in session {session_id}...")
-        answer_text = chain.invoke({
-            "resume": resume_text,
-            "job_description": job_description_text,
-            "analysis_context": initial_analysis, # Renamed variable for clarity
-            "chat_history": chat_history,
-            "current_question": question
-        })
+        prompt_history = get_prompt_chat_history(session_data)
+        system_message = SystemMessage(content=render_prompt(
+            CHAT_SYSTEM_PROMPT_PARTS,
+            resume=resume_text,
+            job_description=job_description_text,
+            analysis_context=initial_analysis
+        ))
+
+        logger.info("Invoking LLM chain for chat in session %s...", session_id)
+        answer_text = get_text_chain().invoke([system_message, *prompt_history, current_user_message])
         logger.info("LLM chat response generated successfully.")
 
-        current_ai_message = AIMessage(content=answer_text)
-        # Update the history list within the retrieved session_data dictionary
-        session_data['chat_history'].append(current_user_message)
-        session_data['chat_history'].append(current_ai_message)
-        save_session_data(session_data) # Saves updated session including new history
+        # Only the new turn is sent to DynamoDB; the stored history is appended in place
+        append_session_chat_turn(session_data, [current_user_message, AIMessage(content=answer_text)])
 
         return create_api_gateway_response(200, {'answer': answer_text})
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
          logger.error("Error decoding JSON body for chat request.")
          return create_api_gateway_response(400, {'error': 'Invalid JSON format in request body'})
+    except AWS_TIMEOUT_ERRORS as e:
+        logger.error("Timed out loading chat session: %s", e)
+        return create_api_gateway_response(504, {'error': 'Session storage timed out, please retry.'})
     except Exception as e:
-        logger.error(f"Error during chat follow-up: {e}", exc_info=True)
+        logger.error("Error during chat follow-up: %s", e, exc_info=True)
         return create_api_gateway_response(500, {'error': 'Internal server error during chat'})
 
 
+# --- Routing Table ---
+# Exact (method, path) routes; the parameterised GET /items/{id} is matched by prefix in handler().
+ROUTES = {
+    ('POST', '/analyze'): perform_resume_analysis,
+    ('POST', '/chat'): handle_chat_follow_up,
+    ('GET', '/items'): get_all_default_item_metadata,
+    ('POST', '/items/batch'): get_default_items_content_batch,
+}
+
 # --- Main Lambda Handler ---
 def handler(event, context):
     """
@@ -375,30 +1020,38 @@ def handler(event, context):
     """
     try:
         http_method = event['requestContext']['http']['method']
+        if http_method == 'OPTIONS':
+            return PREFLIGHT_RESPONSE
         path = event['requestContext']['http']['path']
 
-        logger.info(f"Received event: Method={http_method}, Path={path}")
-        # Consider logging event['rawQueryString'] or specific headers if needed for debugging
+        logger.info("Received event: Method=%s, Path=%s", http_method, path)
+        if logger.isEnabledFor(logging.DEBUG):
+            # Events carry whole resume/JD bodies, so only serialize them when DEBUG is actually on
+            logger.debug("Full event: %s", orjson.dumps(event).decode('utf-8'))
 
         # --- Routing Logic ---
-        if path == '/analyze' and http_method == 'POST':
-            return perform_resume_analysis(event)
-        elif path == '/chat' and http_method == 'POST':
-            return handle_chat_follow_up(event)
-        elif path == '/items' and http_method == 'GET':
-            return get_all_default_item_metadata(event)
+        if len(path) > 1 and path.endswith('/'):
+            path = path.rstrip('/') # Treat '/items/' like '/items'
+        route_handler = ROUTES.get((http_method, path))
+        if route_handler and request_body_too_large(event.get('body') or ''):
+            logger.warning("Rejected oversized request body for %s", path)
+            response = create_api_gateway_response(413, {'error': f'Request body exceeds {MAX_REQUEST_BODY_BYTES} bytes.'})
+        elif route_handler:
+            response = route_handler(event)
         elif path.startswith('/items/') and http_method == 'GET':
-             # Basic check for /items/{id} structure using path parameters
+             # Parameterised /items/{id}; the id itself comes from pathParameters
              if event.get('pathParameters', {}).get('id'):
-                 return get_default_item_content(event)
+                 response = get_default_item_content(event)
              else:
-                 logger.warning(f"Invalid path for get default item content: {path}")
-                 return create_api_gateway_response(400, {'error': "Invalid request path for default item content. Expected /items/{id}."})
+                 logger.warning("Invalid path for get default item content: %s", path)
+                 response = create_api_gateway_response(400, {'error': "Invalid request path for default item content. Expected /items/{id}."})
         else:
-            logger.warning(f"Unhandled route: Method={http_method}, Path={path}")
-            return create_api_gateway_response(404, {'error': 'Not Found'})
+            logger.warning("Unhandled route: Method=%s, Path=%s", http_method, path)
+            response = create_api_gateway_response(404, {'error': 'Not Found'})
+
+        return compress_response_if_accepted(response, event)
 
     except Exception as e:
         # Catch-all for unexpected errors during request processing or routing
-        logger.error(f"Unhandled exception in handler: {e}", exc_info=True)
+        logger.error("Unhandled exception in handler: %s", e, exc_info=True)
         return create_api_gateway_response(500, {'error': 'Internal Server Error'})
\ No newline at end of file
@@ -4,13 +4,32 @@
 import subprocess
 import os
 import sys
+import tempfile
 from datetime import datetime # To add a timestamp
 
 # --- Configuration ---
 NUM_COMMITS = 10  # Number of latest commits to fetch (change as needed)
 OUTPUT_FILE = "RECENT_COMMIT_LOG.md" # Name of the output Markdown file
+READ_CHUNK_SIZE = 65536 # Characters read from 'git log' per chunk
 # --- End Configuration ---
 
+def parse_commit_block(block):
+    """
+    Parses one "HASH\nMESSAGE_BODY" block from the git log output.
+    Returns a dictionary, or None for an empty block (e.g. after the trailing null byte).
+    """
+    block = block.strip()
+    if not block:
+        return None
+    parts = block.split('\n', 1) # Split only on the first newline
+    commit_hash = parts[0]
+    # Handle commits that might only have a hash (e.g., empty message - unlikely but possible)
+    commit_message = parts[1] if len(parts) > 1 else ""
+    return {
+        "hash": commit_hash,
+        "message": commit_message.strip() # Clean up message whitespace
+    }
+
 def get_commit_data(num_commits):
     """
     Fetches commit data (hash and full message) for the last 'num_commits'.
@@ -22,36 +41,39 @@ def get_commit_data(num_commits):
     command = ["git", "log", f"-n{num_commits}", "--pretty=format:%H%n%B%x00"]
     try:
         print(f"Running command: {' '.join(command)}")
-        result = subprocess.run(
+        # Stream stdout in chunks and parse each commit as soon as its null byte arrives,
+        # instead of buffering the whole log (and a split copy of it) in memory.
+        # stderr goes to a temp file, not a second pipe: git blocks if a pipe nobody reads fills up.
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as stderr_file, subprocess.Popen(
             command,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
             text=True,        # Get output as string
-            check=True,       # Raise CalledProcessError on failure
             encoding='utf-8', # Specify encoding
             errors='replace'  # Replace chars that can't be decoded
-        )
-        raw_output = result.stdout.strip() # Remove leading/trailing whitespace
-
-        if not raw_output:
+        ) as proc:
+            commits_data = []
+            pending = "" # Incomplete block carried over between chunks
+            for chunk in iter(lambda: proc.stdout.read(READ_CHUNK_SIZE), ""):
+                *complete_blocks, pending = (pending + chunk).split('\x00')
+                for block in complete_blocks:
+                    commit = parse_commit_block(block)
+                    if commit:
+                        commits_data.append(commit)
+            commit = parse_commit_block(pending)
+            if commit:
+                commits_data.append(commit)
+            proc.wait()
+            stderr_file.seek(0)
+            stderr_output = stderr_file.read()
+
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr_output)
+
+        if not commits_data:
             print("Warning: No commit history found or 'git log' produced empty output.")
             return [] # Return empty list if no commits
 
-        # Split by the null byte separator. Filter out potential empty strings
-        # that might result from trailing null bytes.
-        commit_blocks = [block for block in raw_output.split('\x00') if block]
-
-        commits_data = []
-        for block in commit_blocks:
-            # Each block is "HASH\nMESSAGE_BODY"
-            parts = block.strip().split('\n', 1) # Split only on the first newline
-            commit_hash = parts[0]
-            # Handle commits that might only have a hash (e.g., empty message - unlikely but possible)
-            commit_message = parts[1] if len(parts) > 1 else ""
-            commits_data.append({
-                "hash": commit_hash,
-                "message": commit_message.strip() # Clean up message whitespace
-            })
-
         # Git log returns newest first. The list will be [newest, ..., oldest]
         return commits_data
 
@@ -99,28 +121,31 @@ def write_to_markdown(commits_data, filename, num_requested):
 
     try:
         print(f"\nWriting {actual_commits} commit messages to '{filename}'...")
+        # Build the whole document first, then write it with a single call
+        parts = [
+            f"# Recent Commit Log (Last {title_commits} Commits)\n\n",
+            f"*Generated on: {current_time}*\n",
+        ]
+        # Try to get repo name (directory name) for context
+        try:
+            repo_name = os.path.basename(os.getcwd())
+            parts.append(f"*Repository: `{repo_name}`*\n")
+        except Exception:
+            pass # Ignore if getting cwd fails
+        parts.append("\n---\n\n")
+
+        # Commits are currently newest first from git log
+        for i, commit in enumerate(commits_data):
+            short_hash = commit['hash'][:7] # Use the first 7 chars for a short hash
+            message = commit['message'] if commit['message'] else "[No commit message body]"
+            # Use a code block to preserve formatting of the commit message
+            parts.append(f"## {i+1}. Commit `{short_hash}`\n\n```text\n{message}\n```\n\n")
+            # Add a separator between commits, except for the last one
+            if i < actual_commits - 1:
+                parts.append("---\n\n")
+
         with open(filename, "w", encoding='utf-8') as f:
-            f.write(f"# Recent Commit Log (Last {title_commits} Commits)\n\n")
-            f.write(f"*Generated on: {current_time}*\n")
-            # Try to get repo name (directory name) for context
-            try:
-                repo_name = os.path.basename(os.getcwd())
-                f.write(f"*Repository: `{repo_name}`*\n")
-            except Exception:
-                pass # Ignore if getting cwd fails
-            f.write("\n---\n\n")
-
-            # Commits are currently newest first from git log
-            for i, commit in enumerate(commits_data):
-                short_hash = commit['hash'][:7] # Use the first 7 chars for a short hash
-                f.write(f"## {i+1}. Commit `{short_hash}`\n\n")
-                # Use a code block to preserve formatting of the commit message
-                f.write("```text\n")
-                f.write(commit['message'] if commit['message'] else "[No commit message body]")
-                f.write("\n```\n\n")
-                # Add a separator between commits, except for the last one
-                if i < actual_commits - 1:
-                    f.write("---\n\n")
+            f.write("".join(parts))
 
         print(f"Successfully wrote commit log to '{filename}'.")
         return True
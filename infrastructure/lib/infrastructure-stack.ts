@@ -52,7 +52,14 @@ export class InfrastructureStack extends cdk.Stack {
       partitionKey: { name: 'id', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
       removalPolicy: RemovalPolicy.DESTROY, // Suitable for dev/demo
-      // timeToLiveAttribute: 'ttl', // TTL not strictly needed for defaults unless you want them to expire
+      timeToLiveAttribute: 'ttl', // Expires cached analyses (ANALYSIS#<hash>); default items carry no ttl
+    });
+    // Default items carry type='default' so GET /items is a single-partition Query, not a Scan
+    itemsTable.addGlobalSecondaryIndex({
+      indexName: 'byType',
+      partitionKey: { name: 'type', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: ['name'],
     });
 
     // *** ADDED: Sessions Table ***
@@ -70,12 +77,15 @@ export class InfrastructureStack extends cdk.Stack {
       runtime: lambda.Runtime.PYTHON_3_11,
       handler: 'handler.handler',
       code: lambda.Code.fromAsset(path.join(__dirname, '../../backend'), {
+        exclude: ['__pycache__', '*.pyc'], // Keep local bytecode caches out of the deployment zip
         bundling: {
           image: lambda.Runtime.PYTHON_3_11.bundlingImage,
           command: [
             'bash', '-c', `
             pip install -r requirements.txt -t /asset-output &&
-            cp -au . /asset-output
+            cp -au . /asset-output &&
+            python generate_prompts.py /asset-output &&
+            TIKTOKEN_CACHE_DIR=/asset-output/tiktoken_cache PYTHONPATH=/asset-output python -c "import tiktoken; tiktoken.get_encoding('o200k_base')"
             `
           ],
         },
@@ -85,7 +95,9 @@ export class InfrastructureStack extends cdk.Stack {
         SESSIONS_TABLE_NAME: sessionsTable.tableName,
         LOG_LEVEL: 'INFO',
         // NEW – just the name, **not** the key
-        OPENAI_API_PARAM_NAME: '/ResumeCoach/OpenAIApiKey'
+        OPENAI_API_PARAM_NAME: '/ResumeCoach/OpenAIApiKey',
+        // Tokenizer file baked in at bundling time, so it is never downloaded during a request
+        TIKTOKEN_CACHE_DIR: '/var/task/tiktoken_cache'
       },
       timeout: Duration.seconds(60), // Keep timeout reasonable for LLM calls + DDB I/O
       memorySize: 256, // May need increase depending on memory usage with state
@@ -94,7 +106,7 @@ export class InfrastructureStack extends cdk.Stack {
       architecture: lambda.Architecture.ARM_64,
     });
     // Grant permissions to both tables
-    itemsTable.grantReadData(backendLambda); // Only needs read for defaults
+    itemsTable.grantReadWriteData(backendLambda); // Read defaults, read/write cached analyses
     sessionsTable.grantReadWriteData(backendLambda);
     // --- NEW: allow Lambda to read the SecureString parameter ---
     const paramArn = `arn:aws:ssm:${this.region}:${this.account}:parameter/ResumeCoach/OpenAIApiKey`;
@@ -130,6 +142,7 @@ export class InfrastructureStack extends cdk.Stack {
     // API Routes (No changes)
     httpApi.addRoutes({ path: '/items', methods: [apigwv2.HttpMethod.GET], integration: lambdaIntegration });
     httpApi.addRoutes({ path: '/items/{id}', methods: [apigwv2.HttpMethod.GET], integration: lambdaIntegration });
+    httpApi.addRoutes({ path: '/items/batch', methods: [apigwv2.HttpMethod.POST], integration: lambdaIntegration });
     httpApi.addRoutes({ path: '/analyze', methods: [apigwv2.HttpMethod.POST], integration: lambdaIntegration });
     httpApi.addRoutes({ path: '/chat', methods: [apigwv2.HttpMethod.POST], integration: lambdaIntegration });
 
@@ -1,15 +1,26 @@
 import os
+import codecs
+import contextlib
 import fnmatch
+import functools
+import json
+import mmap
+import operator
+import re
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 # Attempt to import pygments for language detection
 try:
+    from pygments import __version__ as PYGMENTS_VERSION
     from pygments import lexers
     from pygments.util import ClassNotFound
     PYGMENTS_AVAILABLE = True
 except ImportError:
     PYGMENTS_AVAILABLE = False
+    PYGMENTS_VERSION = None
     print("Warning: 'Pygments' library not found. Install it with 'pip install Pygments' for code block language detection.")
 
 # --- Configuration ---
@@ -18,6 +29,17 @@ except ImportError:
 # Use the corrected relative paths or your desired absolute paths
 SOURCE_DIRECTORY = "./"
 OUTPUT_MARKDOWN_FILE = "./project_code.md"
+VERBOSE = False # Print a line per processed file; otherwise only warnings and periodic progress
+PROGRESS_EVERY = 500 # Files between progress lines when not verbose
+OUTPUT_BUFFER_BYTES = 1024 * 1024 # Larger sequential writes while streaming the output
+MAX_FILE_BYTES = 1_000_000 # Larger files (dumps, stray build output) are listed but their content is skipped
+BINARY_SNIFF_BYTES = 8192 # A NUL byte in this prefix marks the file as binary
+MMAP_MIN_BYTES = 256 * 1024 # Files this large are memory-mapped and written straight from the page cache
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4) # File reads are I/O-bound; overlap their latency
+READ_AHEAD = READ_WORKERS * 2 # Rendered sections held ahead of the writer, bounding memory
+INCREMENTAL = True # Reuse unchanged files' sections from the previous output, tracked in a manifest next to it
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1 # Bump when section rendering changes, so old manifests are ignored
 
 # --- Comprehensive Ignore Lists ---
 
@@ -194,22 +216,70 @@ IGNORE_FOLDERS = [
 
 # --- Helper Functions ---
 
-def should_ignore(name, is_dir, ignore_files_patterns, ignore_folders_patterns):
+WILDCARD_CHARS = '*?['
+
+def has_wildcards(pattern):
+    return any(c in pattern for c in WILDCARD_CHARS)
+
+def compile_ignore_patterns(patterns):
+    """
+    Splits fnmatch-style patterns by shape so most names never reach a regex: a set of literal
+    names, tuples of '*suffix' and 'prefix*' strings for str.endswith/startswith, and one regex
+    for whatever is left (e.g. '*generated.*', '*.[1-9]').
+    """
+    # normcase mirrors fnmatch.fnmatch (case-insensitive on Windows)
+    patterns = [os.path.normcase(p) for p in patterns]
+    literals = frozenset(p for p in patterns if not has_wildcards(p))
+    suffix_patterns = [p for p in patterns if p.startswith('*') and not has_wildcards(p[1:])]
+    prefix_patterns = [p for p in patterns if p.endswith('*') and not has_wildcards(p[:-1])]
+    suffixes = tuple(p[1:] for p in suffix_patterns)
+    prefixes = tuple(p[:-1] for p in prefix_patterns)
+    wildcards = [
+        p for p in patterns
+        if has_wildcards(p) and p not in suffix_patterns and p not in prefix_patterns
+    ]
+    if not wildcards:
+        return literals, suffixes, prefixes, re.compile(r'(?!)') # Matches nothing
+    return literals, suffixes, prefixes, re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in wildcards))
+
+def matches_patterns(name, compiled_patterns):
+    """Checks a name against the output of compile_ignore_patterns."""
+    literals, suffixes, prefixes, wildcard_re = compiled_patterns
+    name = os.path.normcase(name)
+    return (
+        name in literals
+        or name.endswith(suffixes)
+        or name.startswith(prefixes)
+        or wildcard_re.match(name) is not None
+    )
+
+def should_ignore(name, is_dir, ignore_files_matcher, ignore_folders_matcher):
     """Checks if a given file or directory name should be ignored."""
-    patterns_to_check = ignore_folders_patterns if is_dir else ignore_files_patterns
-    for pattern in patterns_to_check:
-        if fnmatch.fnmatch(name, pattern):
-            return True
-    # Specifically check if the name matches the output file name
-    # (This check is technically redundant if OUTPUT_MARKDOWN_FILE name matches an IGNORE_FILES pattern)
-    # if not is_dir and name == Path(OUTPUT_MARKDOWN_FILE).name:
-    #     return True
-    return False
-
-def guess_lexer(filename):
-    """Guess the Pygments lexer based on filename, return language string."""
+    return matches_patterns(name, ignore_folders_matcher if is_dir else ignore_files_matcher)
+
+# Pygments filename globs that aren't a plain '*.ext' (Makefile, CMakeLists.txt, *.html.j2, ...).
+# Names matching one of these are cached by full name, since their extension alone doesn't pick the lexer.
+PLAIN_EXTENSION_GLOB = re.compile(r'\*\.[A-Za-z0-9_+\-]+')
+LEXER_NAME_PATTERNS = compile_ignore_patterns(
+    glob
+    for _, _, filenames, _ in lexers.get_all_lexers()
+    for glob in filenames
+    if not PLAIN_EXTENSION_GLOB.fullmatch(glob)
+) if PYGMENTS_AVAILABLE else None
+
+def guess_lexer(filename, extension=None):
+    """Guess the Pygments lexer based on filename, return language string. Pass extension if already split off."""
     if not PYGMENTS_AVAILABLE:
         return ""
+    if extension is None:
+        extension = os.path.splitext(filename)[1]
+    if not extension or matches_patterns(filename, LEXER_NAME_PATTERNS):
+        return _guess_lexer_for_name(filename)
+    # Every other file with this extension matches the same globs, so one guess serves them all
+    return _guess_lexer_for_name(f"x{extension}")
+
+@functools.lru_cache(maxsize=512)
+def _guess_lexer_for_name(filename):
     try:
         lexer = lexers.guess_lexer_for_filename(filename, "")
         return lexer.aliases[0] if lexer.aliases else ""
@@ -219,6 +289,228 @@ def guess_lexer(filename):
         print(f"Warning: Could not guess language for {filename}: {e}")
         return ""
 
+ENTRY_NAME = operator.attrgetter('name') # C-level sort key for DirEntry lists
+
+def _scandir_tree(root, ignore_files_matcher, ignore_folders_matcher):
+    """
+    Yields (entry, rel_path, depth) for every non-ignored file and folder under root,
+    in os.walk's top-down order: a folder's files (sorted) first, then its subfolders.
+    depth is the entry's indent level in the tree. DirEntry caches the type from the
+    directory listing, so no per-entry stat() is needed. Walks with an explicit stack,
+    so deep trees can't hit the recursion limit.
+    """
+    # (folder entry or None for root, path, rel_dir, level); subfolders are pushed in reverse so they pop in listing order
+    stack = [(None, root, '', 0)]
+    while stack:
+        dir_entry, path, rel_dir, level = stack.pop()
+        if dir_entry is not None:
+            yield dir_entry, rel_dir, level
+
+        files = []
+        dirs = []
+        # Bound methods and globals hoisted into locals for the per-entry loop
+        add_file, add_dir, matches = files.append, dirs.append, matches_patterns
+        try:
+            with os.scandir(path) as it:
+                # One pass: the cached DirEntry type picks the bucket, then only that bucket's patterns are checked
+                for entry in it:
+                    if entry.is_dir():
+                        # Like os.walk, don't descend into symlinked folders
+                        if not entry.is_symlink() and not matches(entry.name, ignore_folders_matcher):
+                            add_dir(entry)
+                    elif not matches(entry.name, ignore_files_matcher):
+                        add_file(entry)
+        except OSError as e:
+            print(f"Warning: Could not scan directory {path}: {e}")
+            continue
+
+        file_depth = level + 1 if level else 0 # Root files sit flush; nested files indent under their folder
+        join = os.path.join
+        files.sort(key=ENTRY_NAME)
+        for entry in files:
+            yield entry, join(rel_dir, entry.name), file_depth
+        stack.extend((entry, entry.path, join(rel_dir, entry.name), level + 1) for entry in reversed(dirs))
+
+SECTION_SEPARATOR = ("\n" + ("-" * 80)).encode('utf-8') # Visual separator line
+CODE_FENCE = b"```"
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c" # What bytes.strip() removes
+UTF8_CHECK_CHUNK_BYTES = 64 * 1024
+
+def is_valid_utf8(content):
+    """Checks bytes or an mmap for valid UTF-8, decoding in chunks so a mapped file never becomes one big str."""
+    if isinstance(content, bytes) and content.isascii():
+        return True
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(content)
+    try:
+        for start in range(0, len(view), UTF8_CHECK_CHUNK_BYTES):
+            decoder.decode(view[start:start + UTF8_CHECK_CHUNK_BYTES])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def strip_view(content):
+    """content.strip() for bytes; for an mmap, a zero-copy memoryview of the stripped range."""
+    if isinstance(content, bytes):
+        return content.strip()
+    start, end = 0, len(content)
+    while start < end and content[start] in ASCII_WHITESPACE:
+        start += 1
+    while end > start and content[end - 1] in ASCII_WHITESPACE:
+        end -= 1
+    return memoryview(content)[start:end]
+
+def render_file_section(abs_path, rel_path, name, extension):
+    """
+    Returns (lines, cacheable): the Markdown lines for one file, as UTF-8 bytes (separator,
+    path heading and content), and whether the section may be reused while the file is unchanged.
+    Valid UTF-8 content is passed through as the bytes read, never decoded and re-encoded;
+    large files come back as memoryviews over an mmap, which stays mapped until the writer drops them.
+    """
+    section = []
+    try:
+        # Add separator and file path heading (common to all files)
+        section.append(SECTION_SEPARATOR)
+        section.append(f"## `{rel_path}`".encode('utf-8')) # Use heading for file path
+
+        # Try reading content
+        try:
+            with open(abs_path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size > MAX_FILE_BYTES:
+                    print(f"Skipping large file {rel_path} ({file_size} bytes)")
+                    section.append(f"```\n[skipped: {file_size} bytes]\n```".encode('utf-8'))
+                    return section, True
+                if file_size >= MMAP_MIN_BYTES:
+                    # Map rather than copy into the heap; the mapping is released once nothing references it
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    content = f.read()
+        except Exception as read_err:
+            print(f"Error reading file {rel_path}: {read_err}")
+            content = f"Error reading file: {read_err}"
+            # Decide how to handle read errors - here we put the error in a code block
+            section.append(f"```\n{content}\n```".encode('utf-8'))
+            return section, False # Read errors may be transient (permissions, locks); retry next run
+
+        if content.find(b'\x00', 0, BINARY_SNIFF_BYTES) != -1:
+            print(f"Skipping binary file {rel_path}")
+            section.append(b"```\n[skipped: binary file]\n```")
+            return section, True
+
+        # Only invalid UTF-8 needs a decode/encode pass, to drop the bad bytes
+        if not is_valid_utf8(content):
+            print(f"Warning: Could not decode {rel_path} as UTF-8. Reading with errors ignored.")
+            content = bytes(content).decode('utf-8', errors='ignore').encode('utf-8')
+        if content.find(b'\r') != -1:
+            content = bytes(content).replace(b'\r\n', b'\n').replace(b'\r', b'\n') # Universal newlines, as text mode did
+
+        # <<< CHANGE IS HERE >>>
+        # Check if the file extension is .md (case-insensitive)
+        if extension.lower() == '.md':
+            if VERBOSE:
+                print(f"Processing (Markdown): {rel_path}")
+            # Append raw Markdown content directly
+            section.append(content if isinstance(content, bytes) else memoryview(content))
+        else:
+            if VERBOSE:
+                print(f"Processing (Code):   {rel_path}")
+            # Process other files as code blocks
+            lang = guess_lexer(name, extension)
+            section.append(CODE_FENCE + lang.encode('utf-8'))
+            section.append(strip_view(content)) # Strip whitespace for code blocks
+            section.append(CODE_FENCE)
+        # <<< END OF CHANGE >>>
+
+    except Exception as e:
+        # Catch unexpected errors during processing of a single file
+        print(f"Error processing file {rel_path}: {e}")
+        # Add error message to the markdown output for context
+        section.append(SECTION_SEPARATOR)
+        section.append(f"## `{rel_path}`".encode('utf-8'))
+        section.append(f"\n```\nError processing file: {e}\n```".encode('utf-8'))
+        return section, False
+    return section, True
+
+def render_file_chunks(abs_path, rel_path, name, extension):
+    """
+    Returns (chunks, cacheable) for one file: its lines as bytes-like buffers, each followed
+    by a newline. Kept as separate buffers (not joined) so mapped content is never copied.
+    """
+    lines, cacheable = render_file_section(abs_path, rel_path, name, extension)
+    chunks = []
+    for line in lines:
+        chunks.append(line)
+        chunks.append(b"\n")
+    return chunks, cacheable
+
+def render_file_sections(files_to_include, previous_sections, previous_output):
+    """
+    Yields (file_info, section_chunks, cacheable) for each files_to_include entry in order,
+    reading and rendering up to READ_AHEAD files ahead on a thread pool. Files whose stat
+    matches previous_sections are copied from the previous output instead of re-read.
+    """
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = deque()
+        for file_info in files_to_include:
+            abs_path, rel_path, name, extension, file_stat = file_info
+            previous = previous_sections.get(rel_path)
+            if file_stat is not None and previous is not None and previous[:2] == file_stat:
+                offset, length = previous[2:]
+                previous_output.seek(offset)
+                future = Future()
+                future.set_result(([previous_output.read(length)], True))
+            else:
+                future = executor.submit(render_file_chunks, abs_path, rel_path, name, extension)
+            pending.append((file_info, future))
+            if len(pending) > READ_AHEAD:
+                file_info, future = pending.popleft()
+                yield (file_info, *future.result())
+        while pending:
+            file_info, future = pending.popleft()
+            yield (file_info, *future.result())
+
+def manifest_settings(src_path):
+    """Everything besides a file's own stat that shapes its rendered section."""
+    return [MANIFEST_VERSION, str(src_path), MAX_FILE_BYTES, BINARY_SNIFF_BYTES, PYGMENTS_VERSION]
+
+def load_manifest(manifest_path, output_path, settings):
+    """
+    Returns {rel_path: [mtime_ns, size, offset, length]} locating reusable sections in the
+    previous output, or {} if there's no manifest or it doesn't match that output or settings.
+    """
+    try:
+        with open(manifest_path, 'rb') as f:
+            manifest = json.load(f)
+        output_stat = os.stat(output_path)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('settings') != settings:
+        return {}
+    # An edited or replaced output invalidates every offset in the manifest
+    if manifest.get('output') != [output_stat.st_mtime_ns, output_stat.st_size]:
+        return {}
+    return manifest.get('files', {})
+
+def save_manifest(manifest_path, output_path, settings, file_sections):
+    """Records where each cacheable section sits in the output just written, for the next run."""
+    output_stat = os.stat(output_path)
+    manifest = {
+        'settings': settings,
+        'output': [output_stat.st_mtime_ns, output_stat.st_size],
+        'files': file_sections,
+    }
+    try:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    except OSError as e:
+        print(f"Warning: Could not write manifest {manifest_path}: {e}")
+
+# Tree indents, built once rather than multiplied out for every line
+TREE_INDENT = '    '
+TREE_INDENTS = tuple(TREE_INDENT * depth for depth in range(64))
+
 # --- Core Logic ---
 
 def generate_project_markdown(src_dir, output_file, ignore_files, ignore_folders):
@@ -229,19 +521,20 @@ def generate_project_markdown(src_dir, output_file, ignore_files, ignore_folders
     src_path = Path(src_dir).resolve()
     output_path = Path(output_file).resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_path.with_name(output_path.name + MANIFEST_SUFFIX)
+    temp_output_path = output_path.with_name(output_path.name + ".tmp")
 
     # Prevent reading the output file if it's inside the source directory
     # Add its name to ignore_files dynamically if it's within src_path
     effective_ignore_files = list(ignore_files) # Create a copy
-    try:
-        if output_path.relative_to(src_path):
-             # Check if output is inside source *after* resolving paths
-             if output_path.name not in effective_ignore_files:
-                 print(f"Info: Adding output file '{output_path.name}' to ignore list as it's inside the source directory.")
-                 effective_ignore_files.append(output_path.name)
-    except ValueError:
-        # output_path is not inside src_path, no need to add it to ignores
-        pass
+    # Check if output is inside source *after* resolving paths; the trailing separator
+    # keeps a sibling like ./src-old from matching ./src
+    src_prefix = os.path.normcase(os.path.join(str(src_path), ''))
+    if os.path.normcase(str(output_path)).startswith(src_prefix):
+        for generated_name in (output_path.name, manifest_path.name):
+            if generated_name not in effective_ignore_files:
+                print(f"Info: Adding output file '{generated_name}' to ignore list as it's inside the source directory.")
+                effective_ignore_files.append(generated_name)
 
 
     if not src_path.is_dir():
@@ -253,99 +546,87 @@ def generate_project_markdown(src_dir, output_file, ignore_files, ignore_folders
     print(f"Ignoring Folders: {ignore_folders}")
     print("-" * 30)
 
+    # Compile once per run instead of re-translating every pattern for every name
+    ignore_files_matcher = compile_ignore_patterns(effective_ignore_files)
+    ignore_folders_matcher = compile_ignore_patterns(ignore_folders)
+
     tree_lines = []
     files_to_include = []
 
     print("Generating directory tree and collecting files...")
+    # Bound methods and globals hoisted into locals for the per-entry loop
+    add_tree_line, add_file, splitext = tree_lines.append, files_to_include.append, os.path.splitext
+    indents, max_indent_depth = TREE_INDENTS, len(TREE_INDENTS)
     # Use the resolved absolute path for walking
-    for root, dirs, files in os.walk(src_path, topdown=True):
-        root_path = Path(root)
-        relative_root = root_path.relative_to(src_path)
-
-        # Filter ignored directories using the original ignore_folders list
-        dirs[:] = [d for d in dirs if not should_ignore(d, True, effective_ignore_files, ignore_folders)]
-
-        level = len(relative_root.parts)
-        indent = '    ' * level
-
-        if relative_root != Path('.'):
-            tree_lines.append(f"{indent}*   {root_path.name}{os.sep}")
-            indent += '    '
-
-        files.sort()
-        for filename in files:
-             # Use the effective_ignore_files list here
-            if not should_ignore(filename, False, effective_ignore_files, ignore_folders):
-                abs_file_path = root_path / filename
-                rel_file_path = relative_root / filename
-                files_to_include.append((abs_file_path, rel_file_path))
-                tree_lines.append(f"{indent}-   {filename}")
+    for entry, rel_path, depth in _scandir_tree(str(src_path), ignore_files_matcher, ignore_folders_matcher):
+        indent = indents[depth] if depth < max_indent_depth else TREE_INDENT * depth
+        if entry.is_dir():
+            add_tree_line(f"{indent}*   {entry.name}{os.sep}")
+        else:
+            file_stat = None
+            if INCREMENTAL:
+                try:
+                    stat = entry.stat()
+                    file_stat = [stat.st_mtime_ns, stat.st_size]
+                except OSError:
+                    pass # Rendered fresh; the read reports the error
+            # Split the name once here so rendering doesn't re-parse the path
+            add_file((entry.path, rel_path, entry.name, splitext(entry.name)[1], file_stat))
+            add_tree_line(f"{indent}-   {entry.name}")
 
     print(f"Found {len(files_to_include)} files to include.")
     print("-" * 30)
 
-    print(f"Writing content to Markdown file: {output_path}")
-    all_markdown_content = []
+    settings = manifest_settings(src_path)
+    previous_sections = load_manifest(manifest_path, output_path, settings) if INCREMENTAL else {}
+    if previous_sections:
+        print(f"Reusing unchanged sections from the previous output ({len(previous_sections)} cached).")
+    file_sections = {}
 
-    all_markdown_content.append("# Project Structure")
-    all_markdown_content.append("```")
-    all_markdown_content.append(f".{os.sep} ({src_path.name})")
-    all_markdown_content.extend(tree_lines)
-    all_markdown_content.append("```")
-    all_markdown_content.append("\n# File Contents")
-
-    for abs_path, rel_path in files_to_include:
-        try:
-            # Add separator and file path heading (common to all files)
-            all_markdown_content.append("\n" + ("-" * 80)) # Visual separator line
-            all_markdown_content.append(f"## `{rel_path}`") # Use heading for file path
-
-            # Try reading content
-            try:
-                content = abs_path.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                print(f"Warning: Could not decode {rel_path} as UTF-8. Reading with errors ignored.")
-                content = abs_path.read_text(encoding='utf-8', errors='ignore')
-            except Exception as read_err:
-                print(f"Error reading file {rel_path}: {read_err}")
-                content = f"Error reading file: {read_err}"
-                # Decide how to handle read errors - here we put the error in a code block
-                all_markdown_content.append(f"```\n{content}\n```")
-                continue # Skip to the next file
-
-            # <<< CHANGE IS HERE >>>
-            # Check if the file extension is .md (case-insensitive)
-            if rel_path.suffix.lower() == '.md':
-                print(f"Processing (Markdown): {rel_path}")
-                # Append raw Markdown content directly
-                all_markdown_content.append(content)
-            else:
-                print(f"Processing (Code):   {rel_path}")
-                # Process other files as code blocks
-                lang = guess_lexer(rel_path.name)
-                all_markdown_content.append(f"```{lang}")
-                all_markdown_content.append(content.strip()) # Strip whitespace for code blocks
-                all_markdown_content.append("```")
-            # <<< END OF CHANGE >>>
-
-        except Exception as e:
-            # Catch unexpected errors during processing of a single file
-            print(f"Error processing file {rel_path}: {e}")
-            # Add error message to the markdown output for context
-            all_markdown_content.append("\n" + ("-" * 80))
-            all_markdown_content.append(f"## `{rel_path}`")
-            all_markdown_content.append(f"\n```\nError processing file: {e}\n```")
-
-    # --- Write to Output File ---
+    print(f"Writing content to Markdown file: {output_path}")
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(all_markdown_content))
+        # Stream each section to disk so only one file's content is held in memory at a time
+        # Binary mode: sections are already UTF-8, so file contents skip a text-encoder pass.
+        # Written to a temp file so the previous output stays readable for reuse, and a failed run never truncates it.
+        previous_output_context = open(output_path, 'rb') if previous_sections else contextlib.nullcontext()
+        with open(temp_output_path, 'wb', buffering=OUTPUT_BUFFER_BYTES) as f, previous_output_context as previous_output:
+            header = [
+                "# Project Structure",
+                "```",
+                f".{os.sep} ({src_path.name})",
+                *tree_lines,
+                "```",
+                "\n# File Contents",
+                "",
+            ]
+            header_bytes = "\n".join(header).encode('utf-8')
+            f.write(header_bytes)
+
+            # Track the offset locally; f.tell() would cost a seek syscall per file
+            offset = len(header_bytes)
+            write_chunks = f.writelines
+            sections = render_file_sections(files_to_include, previous_sections, previous_output)
+            for written, (file_info, section, cacheable) in enumerate(sections, start=1):
+                section_length = sum(map(len, section))
+                file_stat = file_info[4]
+                if cacheable and file_stat is not None:
+                    file_sections[file_info[1]] = [*file_stat, offset, section_length]
+                write_chunks(section)
+                offset += section_length
+                if not VERBOSE and written % PROGRESS_EVERY == 0:
+                    print(f"Processed {written}/{len(files_to_include)} files...")
+        os.replace(temp_output_path, output_path)
         print("-" * 30)
         print(f"Successfully created Markdown file: {output_path}")
     except Exception as e:
         print(f"Error writing to output file {output_path}: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(temp_output_path)
         sys.exit(1)
 
+    if INCREMENTAL:
+        save_manifest(manifest_path, output_path, settings, file_sections)
+
 # --- Main Execution ---
 if __name__ == "__main__":
     # Optional: Add more robust argument parsing if needed (e.g., using argparse)
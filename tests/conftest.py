@@ -0,0 +1,14 @@
+"""Shared setup: makes backend/handler.py importable without AWS or OpenAI access."""
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('ITEMS_TABLE_NAME', 'test-items')
+os.environ.setdefault('SESSIONS_TABLE_NAME', 'test-sessions')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+# Nothing listens here, so the import-time DynamoDB warm-up fails fast instead of reaching AWS
+os.environ.setdefault('AWS_ENDPOINT_URL_DYNAMODB', 'http://127.0.0.1:9')
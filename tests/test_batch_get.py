@@ -0,0 +1,61 @@
+import pytest
+
+import handler
+
+
+class FakeDynamoDBResource:
+    """Returns each response in turn from batch_get_item and records the request items it was given."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(handler.time, 'sleep', delays.append)
+    return delays
+
+
+def test_unprocessed_keys_are_retried_once_then_succeed(monkeypatch, sleeps):
+    resource = FakeDynamoDBResource(
+        {'Responses': {'items': [{'id': 'a'}]}, 'UnprocessedKeys': {'items': {'Keys': [{'id': 'b'}], 'ProjectionExpression': 'id'}}},
+        {'Responses': {'items': [{'id': 'b'}]}, 'UnprocessedKeys': {}},
+    )
+    monkeypatch.setattr(handler, 'dynamodb_resource', resource)
+
+    items, unprocessed_keys = handler.batch_get_many('items', [{'id': 'a'}, {'id': 'b'}], ProjectionExpression='id')
+
+    assert items == [{'id': 'a'}, {'id': 'b'}]
+    assert unprocessed_keys == []
+    assert resource.requests[0] == {'items': {'ProjectionExpression': 'id', 'Keys': [{'id': 'a'}, {'id': 'b'}]}}
+    assert resource.requests[1] == {'items': {'Keys': [{'id': 'b'}], 'ProjectionExpression': 'id'}}
+    assert sleeps == [handler.BATCH_GET_BASE_DELAY_SECONDS]
+
+
+def test_keys_still_unprocessed_after_retries_are_returned(monkeypatch, sleeps):
+    unprocessed = {'Responses': {}, 'UnprocessedKeys': {'items': {'Keys': [{'id': 'a'}]}}}
+    resource = FakeDynamoDBResource(*[unprocessed] * (handler.BATCH_GET_MAX_RETRIES + 1))
+    monkeypatch.setattr(handler, 'dynamodb_resource', resource)
+
+    items, unprocessed_keys = handler.batch_get_many('items', [{'id': 'a'}])
+
+    assert items == []
+    assert unprocessed_keys == [{'id': 'a'}]
+    assert sleeps == [handler.BATCH_GET_BASE_DELAY_SECONDS * 2 ** i for i in range(handler.BATCH_GET_MAX_RETRIES)]
+
+
+def test_keys_are_requested_in_chunks_of_the_batch_limit(monkeypatch, sleeps):
+    resource = FakeDynamoDBResource({'Responses': {'items': []}}, {'Responses': {'items': []}})
+    monkeypatch.setattr(handler, 'dynamodb_resource', resource)
+    keys = [{'id': str(i)} for i in range(handler.BATCH_GET_MAX_KEYS + 1)]
+
+    handler.batch_get_many('items', keys)
+
+    assert [len(request['items']['Keys']) for request in resource.requests] == [handler.BATCH_GET_MAX_KEYS, 1]
+    assert sleeps == []
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip('langchain')
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+
+import handler
+
+TRIGGER = handler.CHAT_SUMMARY_TRIGGER_MESSAGES
+RECENT = handler.CHAT_RECENT_MESSAGES
+
+
+class FakeSummaryChain:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        if self.fail:
+            raise RuntimeError('LLM unavailable')
+        return 'SUMMARY'
+
+
+@pytest.fixture
+def summary_chain(monkeypatch):
+    chain = FakeSummaryChain()
+    monkeypatch.setattr(handler, 'get_text_chain', lambda: chain)
+    return chain
+
+
+def make_history(message_count):
+    return [
+        HumanMessage(content=f'q{i}') if i % 2 == 0 else AIMessage(content=f'a{i}')
+        for i in range(message_count)
+    ]
+
+
+def test_history_below_trigger_is_sent_verbatim(summary_chain):
+    history = make_history(TRIGGER - 1)
+    session_data = {'sessionId': 's1', 'chat_history': history}
+
+    assert handler.get_prompt_chat_history(session_data) == history
+    assert summary_chain.calls == []
+    assert 'chatSummary' not in session_data
+
+
+def test_history_at_trigger_is_sent_verbatim(summary_chain):
+    history = make_history(TRIGGER)
+
+    assert handler.get_prompt_chat_history({'sessionId': 's1', 'chat_history': history}) == history
+    assert summary_chain.calls == []
+
+
+def test_history_past_trigger_keeps_recent_messages_after_summary(summary_chain):
+    history = make_history(TRIGGER + 2)
+    session_data = {'sessionId': 's1', 'chat_history': history}
+
+    prompt_history = handler.get_prompt_chat_history(session_data)
+
+    cutoff = len(history) - RECENT
+    assert summary_chain.calls[0][1:-1] == history[:cutoff] # Between the prompt and the closing instruction
+    assert session_data['chatSummary'] == 'SUMMARY'
+    assert session_data['chatSummaryCount'] == cutoff
+    assert isinstance(prompt_history[0], SystemMessage) and 'SUMMARY' in prompt_history[0].content
+    assert prompt_history[1:] == history[cutoff:]
+
+
+def test_existing_summary_is_reused_until_trigger_is_passed_again(summary_chain):
+    history = make_history(RECENT + TRIGGER)
+    session_data = {'sessionId': 's1', 'chat_history': history, 'chatSummary': 'OLD', 'chatSummaryCount': RECENT}
+
+    prompt_history = handler.get_prompt_chat_history(session_data)
+
+    assert summary_chain.calls == []
+    assert 'OLD' in prompt_history[0].content
+    assert prompt_history[1:] == history[RECENT:]
+
+
+def test_failed_summary_falls_back_to_hard_window(monkeypatch):
+    monkeypatch.setattr(handler, 'get_text_chain', lambda: FakeSummaryChain(fail=True))
+    history = make_history(TRIGGER + 4)
+    session_data = {'sessionId': 's1', 'chat_history': history}
+
+    assert handler.get_prompt_chat_history(session_data) == history[-TRIGGER:]
+    assert 'chatSummary' not in session_data
@@ -0,0 +1,123 @@
+import pytest
+
+import handler
+
+
+class FakeItemsTable:
+    def __init__(self, *items):
+        self.items = {item['id']: item for item in items}
+        self.get_item_calls = 0
+
+    def get_item(self, Key):
+        self.get_item_calls += 1
+        item = self.items.get(Key['id'])
+        return {'Item': item} if item else {}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(handler, 'default_item_cache', {})
+
+
+def fetch_item(item_id):
+    return handler.get_default_item_content({'pathParameters': {'id': item_id}, 'headers': {}})
+
+
+def test_non_default_row_is_not_served_or_cached(monkeypatch):
+    table = FakeItemsTable({'id': 'ANALYSIS#abc', 'analysis': 'someone else\'s analysis'})
+    monkeypatch.setattr(handler, 'items_table', table)
+
+    assert fetch_item('ANALYSIS#abc')['statusCode'] == 404
+    assert handler.default_item_cache == {}
+
+
+def test_untagged_legacy_default_row_is_served(monkeypatch):
+    monkeypatch.setattr(handler, 'items_table', FakeItemsTable({'id': 'sample', 'content': 'Sample resume'}))
+
+    assert fetch_item('sample')['statusCode'] == 200
+
+
+def test_row_with_analysis_attribute_is_not_served(monkeypatch):
+    monkeypatch.setattr(handler, 'items_table', FakeItemsTable({'id': 'renamed', 'analysis': 'cached output'}))
+
+    assert fetch_item('renamed')['statusCode'] == 404
+
+
+def test_metadata_by_ids_skips_analysis_rows(monkeypatch):
+    rows = [{'id': 'sample', 'name': 'Sample'}, {'id': 'ANALYSIS#abc', 'name': 'Cached'}]
+    monkeypatch.setattr(handler, 'batch_get_many', lambda *args, **kwargs: (rows, []))
+
+    response = handler.get_all_default_item_metadata({'queryStringParameters': {'ids': 'sample,ANALYSIS#abc'}})
+
+    assert handler.orjson.loads(response['body']) == [{'id': 'sample', 'name': 'Sample'}]
+
+
+def test_default_row_is_served_then_cached(monkeypatch):
+    table = FakeItemsTable({'id': 'sample', 'type': 'default', 'content': 'Sample resume'})
+    monkeypatch.setattr(handler, 'items_table', table)
+
+    assert fetch_item('sample')['statusCode'] == 200
+    assert fetch_item('sample')['statusCode'] == 200
+    assert table.get_item_calls == 1
+
+
+def test_batch_reports_non_default_rows_as_missing(monkeypatch):
+    rows = [{'id': 'sample', 'type': 'default', 'content': 'Sample resume'}, {'id': 'ANALYSIS#abc'}]
+    monkeypatch.setattr(handler, 'batch_get_many', lambda *args, **kwargs: (rows, []))
+
+    response = handler.get_default_items_content_batch({'body': '{"ids": ["sample", "ANALYSIS#abc"]}'})
+
+    assert handler.orjson.loads(response['body']) == {
+        'items': [{'id': 'sample', 'content': 'Sample resume'}],
+        'missing': ['ANALYSIS#abc'],
+    }
+    assert list(handler.default_item_cache) == ['sample']
+
+
+def test_cache_evicts_oldest_entries_beyond_max_size(monkeypatch):
+    monkeypatch.setattr(handler, 'DEFAULT_ITEM_CACHE_MAX_ENTRIES', 2)
+
+    for item_id in ('a', 'b', 'c'):
+        handler.cache_default_item({'id': item_id, 'type': 'default'})
+
+    assert list(handler.default_item_cache) == ['b', 'c']
+
+
+def test_cache_drops_expired_entries_on_insert(monkeypatch):
+    clock = iter([0.0, handler.DEFAULT_ITEM_CACHE_TTL_SECONDS + 1])
+    monkeypatch.setattr(handler.time, 'monotonic', lambda: next(clock))
+
+    handler.cache_default_item({'id': 'old', 'type': 'default'})
+    handler.cache_default_item({'id': 'new', 'type': 'default'})
+
+    assert list(handler.default_item_cache) == ['new']
+
+
+class UntaggedItemsTable:
+    """Legacy table: the type index is empty and the only default row predates the 'type' attribute."""
+
+    def __init__(self, *items):
+        self.items = list(items)
+
+    def query(self, **kwargs):
+        return {'Items': []}
+
+    def scan(self, Segment, **kwargs):
+        return {'Items': self.items if Segment == 0 else []}
+
+
+def test_list_falls_back_to_scan_when_index_is_empty(monkeypatch):
+    monkeypatch.setattr(handler, 'default_item_list_cache', None)
+    monkeypatch.setattr(handler, 'items_table', UntaggedItemsTable({'id': 'sample', 'name': 'Sample'}))
+
+    response = handler.get_all_default_item_metadata({})
+
+    assert handler.orjson.loads(response['body']) == [{'id': 'sample', 'name': 'Sample'}]
+
+
+def test_empty_list_is_not_cached(monkeypatch):
+    monkeypatch.setattr(handler, 'default_item_list_cache', None)
+    monkeypatch.setattr(handler, 'items_table', UntaggedItemsTable())
+
+    assert handler.orjson.loads(handler.get_all_default_item_metadata({})['body']) == []
+    assert handler.default_item_list_cache is None
@@ -0,0 +1,63 @@
+import orjson
+import pytest
+
+import handler
+
+
+def make_event(method, path, body):
+    return {'requestContext': {'http': {'method': method, 'path': path}}, 'headers': {}, 'body': body}
+
+
+@pytest.fixture
+def llm_unreachable(monkeypatch):
+    calls = []
+
+    def fake_get_llm():
+        calls.append(True)
+        return None
+
+    monkeypatch.setattr(handler, 'get_llm', fake_get_llm)
+    return calls
+
+
+def test_invalid_analyze_body_is_rejected_before_loading_llm(llm_unreachable):
+    response = handler.handler(make_event('POST', '/analyze', orjson.dumps({'resume': 'only'}).decode()), None)
+
+    assert response['statusCode'] == 400
+    assert llm_unreachable == []
+
+
+def test_valid_analyze_body_without_llm_returns_503(llm_unreachable, monkeypatch):
+    monkeypatch.setattr(handler, 'get_cached_analysis', lambda cache_key: None)
+    body = orjson.dumps({'resume': 'r', 'job_description': 'jd'}).decode()
+
+    response = handler.handler(make_event('POST', '/analyze', body), None)
+
+    assert response['statusCode'] == 503
+    assert llm_unreachable == [True]
+
+
+def test_cached_analysis_is_served_without_loading_llm(llm_unreachable, monkeypatch):
+    saved_sessions = []
+    monkeypatch.setattr(handler, 'get_cached_analysis', lambda cache_key: 'Cached analysis')
+    monkeypatch.setattr(handler, 'save_session_data', saved_sessions.append)
+    body = orjson.dumps({'resume': 'r', 'job_description': 'jd'}).decode()
+
+    response = handler.handler(make_event('POST', '/analyze', body), None)
+
+    assert response['statusCode'] == 200
+    assert orjson.loads(response['body'])['analysis'] == 'Cached analysis'
+    assert llm_unreachable == []
+    assert saved_sessions[0]['initialAnalysis'] == 'Cached analysis'
+
+
+def test_body_limit_counts_utf8_bytes_not_characters(llm_unreachable):
+    # Under the limit in characters, over it in bytes: each '€' is three UTF-8 bytes
+    resume = '€' * (handler.MAX_REQUEST_BODY_BYTES // 2)
+    body = orjson.dumps({'resume': resume, 'job_description': 'jd'}).decode()
+    assert len(body) < handler.MAX_REQUEST_BODY_BYTES
+
+    response = handler.handler(make_event('POST', '/analyze', body), None)
+
+    assert response['statusCode'] == 413
+    assert llm_unreachable == []
@@ -0,0 +1,45 @@
+import logging
+
+import handler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def slow_to_build(clock, build):
+    """Wraps an item builder so building it takes a full second on the fake clock."""
+    def wrapped(*args):
+        clock.now += 1
+        return build(*args)
+    return wrapped
+
+
+def test_transaction_timing_excludes_item_building(monkeypatch, caplog):
+    clock = FakeClock()
+    monkeypatch.setattr(handler.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(handler, 'build_session_item', slow_to_build(clock, handler.build_session_item))
+    monkeypatch.setattr(handler.dynamodb_client, 'transact_write_items', lambda **kwargs: {})
+    session_data = {'sessionId': 's1', 'resume': 'r', 'jobDescription': 'jd', 'initialAnalysis': 'a', 'chat_history': []}
+
+    with caplog.at_level(logging.WARNING):
+        handler.save_session_with_cached_analysis(session_data, 'ANALYSIS#k', 'a')
+
+    assert 'Slow DynamoDB' not in caplog.text
+
+
+def test_put_timing_excludes_item_building(monkeypatch, caplog):
+    clock = FakeClock()
+    monkeypatch.setattr(handler.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(handler, 'build_session_item', slow_to_build(clock, handler.build_session_item))
+    monkeypatch.setattr(handler.sessions_table, 'put_item', lambda **kwargs: {})
+    session_data = {'sessionId': 's1', 'resume': 'r', 'jobDescription': 'jd', 'initialAnalysis': 'a', 'chat_history': []}
+
+    with caplog.at_level(logging.WARNING):
+        handler.save_session_data(session_data)
+
+    assert 'Slow DynamoDB' not in caplog.text
@@ -0,0 +1,78 @@
+import pytest
+
+tiktoken = pytest.importorskip('tiktoken')
+
+import handler
+
+
+@pytest.fixture
+def byte_encoder(monkeypatch):
+    """A byte-level BPE with no merges (one token per byte) that, like o200k_base, knows <|endoftext|>."""
+    encoder = tiktoken.Encoding(
+        name='test_bytes',
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={'<|endoftext|>': 256},
+    )
+    monkeypatch.setattr(handler, 'token_encoder', encoder)
+    return encoder
+
+
+def test_special_token_text_is_truncated_not_rejected(byte_encoder):
+    text = 'Generated summary <|endoftext|> ' * 100
+
+    truncated = handler.truncate_to_token_limit(text, max_tokens=50)
+
+    assert truncated == text.encode()[:50].decode()
+
+
+def test_text_within_limit_is_unchanged(byte_encoder):
+    text = 'Short resume <|endoftext|>'
+
+    assert handler.truncate_to_token_limit(text, max_tokens=100) == text
+
+
+@pytest.fixture
+def encoder_not_loaded(monkeypatch):
+    monkeypatch.setattr(handler, 'token_encoder', None)
+
+
+def test_missing_cache_dir_falls_back_without_loading(encoder_not_loaded, monkeypatch):
+    monkeypatch.delenv('TIKTOKEN_CACHE_DIR', raising=False)
+    monkeypatch.setattr(tiktoken, 'get_encoding', pytest.fail) # Loading here could mean a download
+
+    truncated = handler.truncate_to_token_limit('x' * 10_000, max_tokens=100)
+
+    assert handler.token_encoder is False
+    assert truncated == 'x' * (100 * handler.APPROX_CHARS_PER_TOKEN)
+
+
+def test_unloadable_encoding_falls_back_to_characters(encoder_not_loaded, monkeypatch, tmp_path):
+    monkeypatch.setenv('TIKTOKEN_CACHE_DIR', str(tmp_path))
+
+    def failing_get_encoding(name):
+        raise ConnectionError('no network')
+
+    monkeypatch.setattr(tiktoken, 'get_encoding', failing_get_encoding)
+
+    truncated = handler.truncate_to_token_limit('x' * 10_000, max_tokens=100)
+
+    assert handler.token_encoder is False
+    assert truncated == 'x' * (100 * handler.APPROX_CHARS_PER_TOKEN)
+
+
+def test_encoding_is_loaded_from_cache_dir(encoder_not_loaded, monkeypatch, tmp_path):
+    monkeypatch.setenv('TIKTOKEN_CACHE_DIR', str(tmp_path))
+    loaded = []
+    monkeypatch.setattr(tiktoken, 'get_encoding', lambda name: loaded.append(name) or 'encoder')
+
+    assert handler.get_token_encoder() == 'encoder'
+    assert loaded == [handler.TOKEN_ENCODING_NAME]
+
+
+def test_multibyte_text_under_the_character_count_is_still_capped(byte_encoder):
+    text = '😀' * 40 # 40 characters, 160 UTF-8 bytes, so 160 tokens in a one-token-per-byte encoding
+
+    truncated = handler.truncate_to_token_limit(text, max_tokens=50)
+
+    assert len(byte_encoder.encode_ordinary(truncated)) <= 50